@@ -1,22 +1,73 @@
+import argparse
+import bisect
+import csv
+import glob
+import hashlib
+import io
 import json
+import os
 import re
 import sys
+import time
 import zipfile
-from dataclasses import dataclass
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, IO, AbstractSet, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 from xml.etree import ElementTree as ET
 
+from workout_template_validator import TemplateValidator, ValidationIssue
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+# concurrent.futures (multiprocessing), tracemalloc and the database backends are imported where
+# they are used: together they are a large share of startup, and a plain one-workbook run needs
+# none of them.
 
 NS_MAIN = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 NS_RELS = {"r": "http://schemas.openxmlformats.org/package/2006/relationships"}
 
+# Patterns used in per-cell/per-row loops are compiled once at import time
+_SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SEP_RE = re.compile(r"[\s_-]+")
+_SLUG_TRIM_RE = re.compile(r"^-+|-+$")
+_INT_RE = re.compile(r"(\d+)")
+_NUMBER_RE = re.compile(r"(\d+(?:[.,]\d+)?)")
+_CELL_REF_RE = re.compile(r"^([A-Z]+)(\d+)$")
+_DAY_HEADER_RE = re.compile(r"^(DAY|GIORNO)\s*(\d+)\s*-\s*(.+)$", re.IGNORECASE)
+_EMOM_MINUTES_RE = re.compile(r"EMOM\s+(\d+)\s*MIN", re.IGNORECASE)
+_ROUNDS_RE = re.compile(r"(\d+)\s*ROUND", re.IGNORECASE)
+_REST_SECONDS_RE = re.compile(r"(\d+)\s*sec", re.IGNORECASE)
+_MINUTE_A_PREFIX_RE = re.compile(r"^\s*Minuto\s*A\b.*?\)\s*", re.IGNORECASE)
+_MINUTE_B_PREFIX_RE = re.compile(r"^\s*Minuto\s*B\b.*?\)\s*", re.IGNORECASE)
+_EXTRA_PREFIX_RE = re.compile(r"^\s*Extra\s*:\s*", re.IGNORECASE)
+
+# Row classifier: one anchored alternation over column A. The alternatives are mutually exclusive
+# (they differ in how the cell starts), so `lastgroup` names the row kind and the inner groups
+# hold its captures.
+_ROW_KIND_RE = re.compile(
+    r"^(?:"
+    r"(?P<day_header>(?:DAY|GIORNO)\s*(?P<day_num>\d+)\s*-\s*(?P<day_rest>.+)$)"
+    r"|(?P<table_header>(?:ESERCIZIO / SEZIONE|EXERCISE SELECTION)$)"
+    r"|(?P<cooldown>COOL-DOWN|DEFATICAMENTO)"
+    r"|(?P<minute_a>\s*Minuto\s*A\b)"
+    r"|(?P<minute_b>\s*Minuto\s*B\b)"
+    r"|(?P<extra>\s*Extra\s*:)"
+    r"|(?P<station>\s*(?P<station_order>\d+)\.\s*(?P<station_label>.+)$)"
+    r")",
+    re.IGNORECASE,
+)
+
 
 def _slugify(text: str) -> str:
     s = text.lower().strip()
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s_-]+", "-", s)
-    s = re.sub(r"^-+|-+$", "", s)
+    s = _SLUG_STRIP_RE.sub("", s)
+    s = _SLUG_SEP_RE.sub("-", s)
+    s = _SLUG_TRIM_RE.sub("", s)
     return s or "template"
 
 
@@ -27,11 +78,14 @@ def _clean_text(v: Optional[str]) -> Optional[str]:
     return s if s else None
 
 
-def _parse_int(v: Optional[str]) -> Optional[int]:
-    s = _clean_text(v)
-    if not s:
-        return None
-    m = re.search(r"(\d+)", s)
+# Bound for the parsed-target memos. Targets ("3x10", "60 sec", "12,5 kg") repeat across every
+# sheet of a workbook, so a few thousand distinct strings cover even large programs.
+PARSE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_clean_int(s: str) -> Optional[int]:
+    m = _INT_RE.search(s)
     if not m:
         return None
     try:
@@ -40,12 +94,10 @@ def _parse_int(v: Optional[str]) -> Optional[int]:
         return None
 
 
-def _parse_number(v: Optional[str]) -> Optional[float]:
-    s = _clean_text(v)
-    if not s:
-        return None
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_clean_number(s: str) -> Optional[float]:
     # Support "100 kg", "12.5", "12,5"
-    m = re.search(r"(\d+(?:[.,]\d+)?)", s)
+    m = _NUMBER_RE.search(s)
     if not m:
         return None
     try:
@@ -54,6 +106,16 @@ def _parse_number(v: Optional[str]) -> Optional[float]:
         return None
 
 
+def _parse_int(v: Optional[str]) -> Optional[int]:
+    s = _clean_text(v)
+    return _parse_clean_int(s) if s else None
+
+
+def _parse_number(v: Optional[str]) -> Optional[float]:
+    s = _clean_text(v)
+    return _parse_clean_number(s) if s else None
+
+
 def _looks_like_day_header(a: str) -> Optional[Tuple[int, str]]:
     """
     Returns (day_number, normalized_header_text_without_week_prefix) if this cell is a day header.
@@ -64,7 +126,7 @@ def _looks_like_day_header(a: str) -> Optional[Tuple[int, str]]:
     s = _clean_text(a)
     if not s:
         return None
-    m = re.match(r"^(DAY|GIORNO)\s*(\d+)\s*-\s*(.+)$", s.strip(), flags=re.IGNORECASE)
+    m = _DAY_HEADER_RE.match(s.strip())
     if not m:
         return None
     day_num = int(m.group(2))
@@ -85,26 +147,187 @@ def _section_type_from_name(workout_name: str) -> str:
     return "strength"
 
 
-def _extract_after_colon_or_strip_prefix(text: str, prefix_regex: str) -> str:
-    s = _clean_text(text) or ""
+def _extract_after_colon_or_strip_prefix(text: str, prefix_re: "re.Pattern[str]") -> str:
+    # `text` is a grid value, already cleaned at ingest
+    s = text or ""
     if ":" in s:
         # Keep what's after the last colon (handles "Minuto A (...) : Exercise")
         after = s.split(":")[-1].strip()
         return after if after else s
     # Otherwise strip the prefix pattern
-    stripped = re.sub(prefix_regex, "", s, flags=re.IGNORECASE).strip()
+    stripped = prefix_re.sub("", s).strip()
     return stripped if stripped else s
 
 
+@dataclass
+class ProfileEvent:
+    __slots__ = ("stage", "sheet", "section", "seconds", "rows", "cells", "alloc_bytes")
+
+    # "open_workbook", "shared_strings", "parse_sheet", "extract_<type>", "write_output"
+    stage: str
+    sheet: Optional[str]
+    # Workout name for extract_* events
+    section: Optional[str]
+    seconds: float
+    rows: int
+    cells: int
+    # Net bytes allocated while the stage ran; None unless tracemalloc is tracing
+    alloc_bytes: Optional[int]
+
+
+_PROFILE_HOOKS: List[Callable[[ProfileEvent], None]] = []
+
+
+def register_profile_hook(hook: Callable[[ProfileEvent], None]) -> None:
+    """
+    Calls `hook(event)` for every instrumented stage from now on. Events from --jobs worker
+    processes are replayed in the parent once their sheet or workbook is done.
+    """
+    _PROFILE_HOOKS.append(hook)
+
+
+def unregister_profile_hook(hook: Callable[[ProfileEvent], None]) -> None:
+    if hook in _PROFILE_HOOKS:
+        _PROFILE_HOOKS.remove(hook)
+
+
+def _profile_start() -> Optional[Tuple[float, Optional[int]]]:
+    # Instrumentation costs one list check per stage when nobody is listening
+    if not _PROFILE_HOOKS:
+        return None
+    import tracemalloc
+
+    mem = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    return time.perf_counter(), mem
+
+
+def _profile_emit(
+    start: Optional[Tuple[float, Optional[int]]],
+    stage: str,
+    sheet: Optional[str] = None,
+    section: Optional[str] = None,
+    rows: int = 0,
+    cells: int = 0,
+    seconds: Optional[float] = None,
+) -> None:
+    if start is None or not _PROFILE_HOOKS:
+        return
+    import tracemalloc
+
+    t0, m0 = start
+    if seconds is None:
+        seconds = time.perf_counter() - t0
+    alloc = None
+    if m0 is not None and tracemalloc.is_tracing():
+        alloc = tracemalloc.get_traced_memory()[0] - m0
+    _dispatch_profile_event(ProfileEvent(stage, sheet, section, seconds, rows, cells, alloc))
+
+
+def _dispatch_profile_event(event: ProfileEvent) -> None:
+    for hook in list(_PROFILE_HOOKS):
+        hook(event)
+
+
+class Profiler:
+    """
+    Profile hook that keeps every event and summarises them per stage, sheet and section.
+
+    Use as a context manager to register it (and optionally start tracemalloc) for a block.
+    """
+
+    def __init__(self, track_memory: bool = False) -> None:
+        self.track_memory = track_memory
+        self.events: List[ProfileEvent] = []
+        self._started_tracemalloc = False
+
+    def __call__(self, event: ProfileEvent) -> None:
+        self.events.append(event)
+
+    def __enter__(self) -> "Profiler":
+        import tracemalloc
+
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        register_profile_hook(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        unregister_profile_hook(self)
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def by_stage(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        for ev in self.events:
+            t = totals.setdefault(ev.stage, {"calls": 0, "seconds": 0.0, "rows": 0, "cells": 0, "alloc_bytes": 0})
+            t["calls"] += 1
+            t["seconds"] += ev.seconds
+            t["rows"] += ev.rows
+            t["cells"] += ev.cells
+            t["alloc_bytes"] += ev.alloc_bytes or 0
+        return totals
+
+    def to_json(self) -> Dict:
+        return {
+            "events": [{k: getattr(ev, k) for k in ProfileEvent.__slots__} for ev in self.events],
+            "stages": self.by_stage(),
+        }
+
+    def summary(self, top: int = 5) -> str:
+        lines = [f"{'stage':<16}{'calls':>7}{'seconds':>10}{'rows':>10}{'cells':>11}{'alloc MB':>10}"]
+        for stage, t in self.by_stage().items():
+            lines.append(
+                f"{stage:<16}{t['calls']:>7}{t['seconds']:>10.4f}{t['rows']:>10}{t['cells']:>11}"
+                f"{t['alloc_bytes'] / (1024 * 1024):>10.2f}"
+            )
+        sheets = sorted((ev for ev in self.events if ev.stage == "parse_sheet"), key=lambda ev: -ev.seconds)
+        if sheets:
+            lines.append("Slowest sheets (parse):")
+            for ev in sheets[:top]:
+                lines.append(f"  {ev.seconds:8.4f}s  {ev.sheet}  ({ev.rows} rows, {ev.cells} cells)")
+        sections = sorted((ev for ev in self.events if ev.section), key=lambda ev: -ev.seconds)
+        if sections:
+            lines.append("Slowest sections (extract):")
+            for ev in sections[:top]:
+                lines.append(f"  {ev.seconds:8.4f}s  {ev.section}  ({ev.rows} rows)")
+        return "\n".join(lines)
+
+
+# Columns read by the extract_* functions; sheets are projected to these by default
+EXTRACTOR_COLUMNS: Tuple[str, ...] = ("A", "B", "C", "D")
+
+
 @dataclass
 class SheetGrid:
+    """
+    Sparse columnar sheet: only non-empty cells are stored, and sorted row indexes let every
+    iteration jump straight to populated rows. Cost scales with filled cells, not with the
+    highest row number (exports often carry stray formatting down to row 1,048,576).
+    """
+
+    __slots__ = ("name", "columns", "column_rows", "rows", "max_row")
+
     name: str
-    # (row_number, col_letters) -> value
-    cells: Dict[Tuple[int, str], str]
+    # col_letters -> {row number: value}; values are already cleaned
+    columns: Dict[str, Dict[int, str]]
+    # col_letters -> sorted row numbers with a value in that column
+    column_rows: Dict[str, List[int]]
+    # Sorted row numbers with a value in any column
+    rows: List[int]
+    # Highest populated row (0 for an empty sheet)
     max_row: int
 
     def get(self, row: int, col: str) -> Optional[str]:
-        return _clean_text(self.cells.get((row, col.upper())))
+        values = self.columns.get(col)
+        if values is None:
+            values = self.columns.get(col.upper())
+            if values is None:
+                return None
+        return values.get(row)
 
     def col_a(self, row: int) -> Optional[str]:
         return self.get(row, "A")
@@ -112,79 +335,233 @@ class SheetGrid:
     def col_b(self, row: int) -> Optional[str]:
         return self.get(row, "B")
 
-    def iter_rows(self, start: int, end: int) -> List[int]:
-        if end < start:
-            return []
-        return list(range(start, min(end, self.max_row) + 1))
-
-
-def _parse_xlsx_sheet_xml(sheet_name: str, xml_bytes: bytes) -> SheetGrid:
-    root = ET.fromstring(xml_bytes)
-    cells: Dict[Tuple[int, str], str] = {}
-    max_row = 0
-
-    sheet_data = root.find("m:sheetData", NS_MAIN)
-    if sheet_data is None:
-        return SheetGrid(name=sheet_name, cells=cells, max_row=0)
-
-    for row_el in sheet_data.findall("m:row", NS_MAIN):
-        r_attr = row_el.get("r")
-        if not r_attr:
-            continue
+    def get_int(self, row: int, col: str) -> Optional[int]:
+        v = self.get(row, col)
+        return _parse_clean_int(v) if v else None
+
+    def get_number(self, row: int, col: str) -> Optional[float]:
+        v = self.get(row, col)
+        return _parse_clean_number(v) if v else None
+
+    def iter_rows(self, start: int, end: int) -> Iterator[int]:
+        """
+        Yields the populated row numbers within [start, end], in order.
+        """
+        rows = self.rows
+        for i in range(bisect.bisect_left(rows, start), bisect.bisect_right(rows, end)):
+            yield rows[i]
+
+    def iter_column(self, col: str, start: int, end: int) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (row_number, value) for non-empty cells of `col` within [start, end].
+        """
+        col = col.upper()
+        rows = self.column_rows.get(col)
+        if not rows:
+            return
+        values = self.columns[col]
+        for i in range(bisect.bisect_left(rows, start), bisect.bisect_right(rows, end)):
+            r = rows[i]
+            yield r, values[r]
+
+
+_TAG_ROW = f"{{{NS_MAIN['m']}}}row"
+_TAG_CELL = f"{{{NS_MAIN['m']}}}c"
+_TAG_SHEET_DATA = f"{{{NS_MAIN['m']}}}sheetData"
+_TAG_SI = f"{{{NS_MAIN['m']}}}si"
+_TAG_T = f"{{{NS_MAIN['m']}}}t"
+_TAG_RPH = f"{{{NS_MAIN['m']}}}rPh"
+
+REL_TYPE_SHARED_STRINGS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+
+
+def _read_cell_text(c_el: ET.Element, shared_strings: Optional[Sequence[str]] = None) -> Optional[str]:
+    cell_type = c_el.get("t")
+    if cell_type == "s":
+        # Shared string: <v> holds an index into xl/sharedStrings.xml
+        v_el = c_el.find("m:v", NS_MAIN)
+        if shared_strings is None or v_el is None or not v_el.text:
+            return None
         try:
-            row_num = int(r_attr)
-        except Exception:
+            return shared_strings[int(v_el.text)]
+        except (ValueError, IndexError):
+            return None
+    if cell_type == "inlineStr":
+        is_el = c_el.find("m:is", NS_MAIN)
+        if is_el is None:
+            return None
+        # inline string may have multiple <t> nodes; join them
+        parts = [t_el.text or "" for t_el in is_el.findall(".//m:t", NS_MAIN)]
+        return "".join(parts)
+    # For our workbook, most meaningful strings are inlineStr.
+    v_el = c_el.find("m:v", NS_MAIN)
+    if v_el is not None and v_el.text is not None:
+        return v_el.text
+    return None
+
+
+def _iter_xlsx_sheet_rows(
+    source: Union[bytes, IO[bytes]],
+    shared_strings: Optional[Sequence[str]] = None,
+    columns: Optional[AbstractSet[str]] = None,
+) -> Iterator[Tuple[int, List[Tuple[str, str]]]]:
+    """
+    Streams a worksheet XML and yields (row_number, [(col_letters, cleaned_text), ...]) per <row>.
+
+    Rows are cleared from the tree as soon as they are yielded, so memory stays bounded by the
+    widest row instead of growing with the whole sheet. Empty rows are still yielded so callers
+    can track the highest row number. When `columns` is given, cells in other columns are skipped
+    before their text is decoded.
+    """
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    sheet_data: Optional[ET.Element] = None
+    row_num: Optional[int] = None
+    row_cells: List[Tuple[str, str]] = []
+    # Raw inline/number text -> cleaned, interned value, so repeated targets are cleaned once
+    # per sheet and share one string object
+    cleaned: Dict[str, str] = {}
+
+    for event, el in ET.iterparse(stream, events=("start", "end")):
+        tag = el.tag
+        if event == "start":
+            if tag == _TAG_ROW:
+                try:
+                    row_num = int(el.get("r") or "")
+                except Exception:
+                    row_num = None
+                row_cells = []
+            elif tag == _TAG_SHEET_DATA:
+                sheet_data = el
             continue
-        max_row = max(max_row, row_num)
 
-        for c_el in row_el.findall("m:c", NS_MAIN):
-            ref = c_el.get("r")  # e.g. "A12"
+        if tag == _TAG_CELL:
+            if row_num is None:
+                continue
+            ref = el.get("r")  # e.g. "A12"
             if not ref:
                 continue
-            m = re.match(r"^([A-Z]+)(\d+)$", ref)
+            m = _CELL_REF_RE.match(ref)
             if not m:
                 continue
             col_letters = m.group(1)
-
-            cell_type = c_el.get("t")
-            text_val: Optional[str] = None
-            if cell_type == "inlineStr":
-                is_el = c_el.find("m:is", NS_MAIN)
-                if is_el is not None:
-                    # inline string may have multiple <t> nodes; join them
-                    parts = [t_el.text or "" for t_el in is_el.findall(".//m:t", NS_MAIN)]
-                    text_val = "".join(parts)
+            if columns is not None and col_letters not in columns:
+                continue
+            raw = _read_cell_text(el, shared_strings)
+            if raw is None:
+                continue
+            if el.get("t") == "s":
+                # Pool entries were cleaned and interned when the pool was loaded
+                text_val = raw
             else:
-                # For our workbook, most meaningful strings are inlineStr.
-                v_el = c_el.find("m:v", NS_MAIN)
-                if v_el is not None and v_el.text is not None:
-                    text_val = v_el.text
-
-            text_val = _clean_text(text_val)
+                text_val = cleaned.get(raw)
+                if text_val is None:
+                    text_val = cleaned[raw] = sys.intern(_clean_text(raw) or "")
             if text_val:
-                cells[(row_num, col_letters)] = text_val
+                row_cells.append((col_letters, text_val))
+        elif tag == _TAG_ROW:
+            if row_num is not None:
+                yield row_num, row_cells
+            row_num = None
+            row_cells = []
+            # Drop the finished row (and any earlier siblings) so the tree never grows
+            if sheet_data is not None:
+                sheet_data.clear()
+            else:
+                el.clear()
 
-    return SheetGrid(name=sheet_name, cells=cells, max_row=max_row)
+
+def _parse_xlsx_sheet_xml(
+    sheet_name: str,
+    xml_source: Union[bytes, IO[bytes]],
+    shared_strings: Optional[Sequence[str]] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> SheetGrid:
+    """
+    Builds a columnar SheetGrid. `columns` projects the sheet to the given column letters
+    (e.g. EXTRACTOR_COLUMNS); None keeps every column.
+    """
+    wanted = frozenset(c.upper() for c in columns) if columns is not None else None
+    return _build_sheet_grid(sheet_name, _iter_xlsx_sheet_rows(xml_source, shared_strings, wanted))
 
 
-def _load_workbook_sheets(xlsx_path: Path) -> List[Tuple[str, bytes]]:
+def _build_sheet_grid(sheet_name: str, rows_source: Iterable[Tuple[int, List[Tuple[str, str]]]]) -> SheetGrid:
     """
-    Returns list of (sheet_name, sheet_xml_bytes) in workbook order.
+    Builds a SheetGrid from any reader's row stream of (row_number, [(col_letters, cleaned_text)]).
     """
-    with zipfile.ZipFile(xlsx_path, "r") as zf:
-        workbook_xml = zf.read("xl/workbook.xml")
-        rels_xml = zf.read("xl/_rels/workbook.xml.rels")
+    span = _profile_start()
+    grid_columns: Dict[str, Dict[int, str]] = {}
+    column_rows: Dict[str, List[int]] = {}
+    rows: List[int] = []
+    # <row> elements are in ascending order in files written by Excel; others are sorted at the end
+    ordered = True
+    n_rows = 0
+    n_cells = 0
+
+    for row_num, row_cells in rows_source:
+        n_rows += 1
+        # Formatting-only rows carry no values and cost nothing past this point
+        if not row_cells or row_num < 1:
+            continue
+        n_cells += len(row_cells)
+        if not rows or row_num > rows[-1]:
+            rows.append(row_num)
+        elif row_num != rows[-1]:
+            ordered = False
+            rows.append(row_num)
+        for col_letters, text_val in row_cells:
+            values = grid_columns.get(col_letters)
+            if values is None:
+                values = grid_columns[col_letters] = {}
+                column_rows[col_letters] = []
+            if row_num not in values:
+                column_rows[col_letters].append(row_num)
+            values[row_num] = text_val
+
+    if not ordered:
+        rows = sorted(set(rows))
+        column_rows = {col: sorted(col_rows) for col, col_rows in column_rows.items()}
+
+    _profile_emit(span, "parse_sheet", sheet_name, rows=n_rows, cells=n_cells)
+    return SheetGrid(
+        name=sheet_name,
+        columns=grid_columns,
+        column_rows=column_rows,
+        rows=rows,
+        max_row=rows[-1] if rows else 0,
+    )
 
-    wb_root = ET.fromstring(workbook_xml)
-    rels_root = ET.fromstring(rels_xml)
 
-    # Map rId -> Target
-    rid_to_target: Dict[str, str] = {}
+def _workbook_part_path(target: str) -> str:
+    # Targets may be absolute like "/xl/worksheets/sheet1.xml" or relative like "worksheets/sheet1.xml"
+    target_norm = target.lstrip("./").lstrip("/")
+    if target_norm.lower().startswith("xl/"):
+        return target_norm
+    return f"xl/{target_norm}"
+
+
+def _read_workbook_rels(zf: zipfile.ZipFile) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns rId -> (relationship_type, zip_entry_path) for xl/workbook.xml.
+    """
+    rels_root = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    rels: Dict[str, Tuple[str, str]] = {}
     for rel in rels_root.findall("r:Relationship", NS_RELS):
         rid = rel.get("Id")
         target = rel.get("Target")
         if rid and target:
-            rid_to_target[rid] = target
+            rels[rid] = (rel.get("Type") or "", _workbook_part_path(target))
+    return rels
+
+
+def _resolve_workbook_sheet_paths(
+    zf: zipfile.ZipFile, rels: Optional[Dict[str, Tuple[str, str]]] = None
+) -> List[Tuple[str, str]]:
+    """
+    Returns list of (sheet_name, zip_entry_path) in workbook order.
+    """
+    wb_root = ET.fromstring(zf.read("xl/workbook.xml"))
+    if rels is None:
+        rels = _read_workbook_rels(zf)
 
     sheets_el = wb_root.find("m:sheets", NS_MAIN)
     if sheets_el is None:
@@ -196,344 +573,2608 @@ def _load_workbook_sheets(xlsx_path: Path) -> List[Tuple[str, bytes]]:
         rid = sheet.get("{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id")
         if not name or not rid:
             continue
-        target = rid_to_target.get(rid)
-        if not target:
+        rel = rels.get(rid)
+        if not rel:
             continue
-        # Targets may be absolute like "/xl/worksheets/sheet1.xml" or relative like "worksheets/sheet1.xml"
-        target_norm = target.lstrip("./").lstrip("/")
-        if target_norm.lower().startswith("xl/"):
-            sheet_path = target_norm
-        else:
-            sheet_path = f"xl/{target_norm}"
-        ordered.append((name, sheet_path))
-
-    out: List[Tuple[str, bytes]] = []
-    with zipfile.ZipFile(xlsx_path, "r") as zf:
-        for sheet_name, sheet_path in ordered:
-            out.append((sheet_name, zf.read(sheet_path)))
-    return out
-
-
-def _extract_warmup(grid: SheetGrid, start_row: int, end_row: int) -> List[Dict[str, str]]:
-    warmup_header = None
-    main_header = None
-    for r in grid.iter_rows(start_row, end_row):
-        a = (grid.col_a(r) or "").upper()
-        if warmup_header is None and "RISCALDAMENTO" in a:
-            warmup_header = r
-        if "ALLENAMENTO PRINCIPALE" in a:
-            main_header = r
-            break
-    if warmup_header is None or main_header is None or main_header <= warmup_header:
+        ordered.append((name, rel[1]))
+    return ordered
+
+
+def _shared_strings_path(rels: Dict[str, Tuple[str, str]]) -> str:
+    sst_path = next((path for rel_type, path in rels.values() if rel_type == REL_TYPE_SHARED_STRINGS), None)
+    return sst_path or "xl/sharedStrings.xml"
+
+
+def _load_shared_strings(zf: zipfile.ZipFile, rels: Optional[Dict[str, Tuple[str, str]]] = None) -> List[str]:
+    """
+    Loads the workbook shared-strings table as an indexed pool of cleaned, interned strings.
+
+    Each distinct label is stored once and every `t="s"` cell that references it shares the same
+    object. Missing or blank entries are kept as "" so indexes stay aligned.
+    """
+    if rels is None:
+        rels = _read_workbook_rels(zf)
+    try:
+        stream = zf.open(_shared_strings_path(rels), "r")
+    except KeyError:
         return []
 
-    items: List[Dict[str, str]] = []
-    for r in grid.iter_rows(warmup_header + 1, main_header - 1):
-        label = grid.col_a(r)
-        target = grid.col_b(r)
-        if not label or not target:
-            continue
-        # Skip column header rows if they appear
-        if label.strip().upper() in {"ESERCIZIO / SEZIONE", "EXERCISE SELECTION"}:
-            continue
-        items.append({"label": label, "target": target})
-    return items
+    pool: List[str] = []
+    sst: Optional[ET.Element] = None
+    with stream:
+        for event, el in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if sst is None:
+                    sst = el
+                continue
+            if el.tag != _TAG_SI:
+                continue
+            # Plain <si><t>..</t></si> or rich text runs <si><r><t>..</t></r>...</si>;
+            # phonetic hints (<rPh>) are not part of the displayed value.
+            parts: List[str] = []
+            for child in el:
+                if child.tag == _TAG_T:
+                    parts.append(child.text or "")
+                elif child.tag != _TAG_RPH:
+                    parts.extend(t_el.text or "" for t_el in child.iter(_TAG_T))
+            pool.append(sys.intern(_clean_text("".join(parts)) or ""))
+            # Detach finished <si> entries from <sst> so the tree never grows with the pool
+            if sst is not None:
+                sst.clear()
+    return pool
+
+
+class _SharedStringRefs:
+    """
+    Shared-strings pool wrapper that records the highest index a sheet reads, so the sheet's
+    cache entry only depends on that prefix of the pool.
+    """
 
+    __slots__ = ("pool", "max_index")
 
-def extract_strength_workout(grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
-    header_row = None
-    for r in grid.iter_rows(start_row, min(end_row, start_row + 6)):
-        if (grid.col_a(r) or "").strip().upper() == "EXERCISE SELECTION":
-            header_row = r
-            break
-
-    if header_row is None:
-        # Fallback: assume table starts right after title row
-        header_row = start_row + 1
-
-    exercises: List[Dict] = []
-    for r in grid.iter_rows(header_row + 1, end_row):
-        a = grid.col_a(r)
-        if not a:
-            continue
-        up = a.upper()
-        if up.startswith("COOL-DOWN") or up.startswith("DEFATICAMENTO"):
-            break
-        if _looks_like_day_header(a):
-            break
-
-        name = a
-        reps = _parse_int(grid.get(r, "C"))
-        sets = _parse_int(grid.get(r, "D"))
+    def __init__(self, pool: Sequence[str]) -> None:
+        self.pool = pool
+        self.max_index = -1
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def __getitem__(self, i: int) -> str:
+        text = self.pool[i]
+        if i < 0:
+            i += len(self.pool)
+        if i > self.max_index:
+            self.max_index = i
+        return text
+
+
+class _SharedStringPrefixes:
+    """
+    sha1 of the first n pool entries for any n. Digests are computed incrementally from the
+    nearest shorter prefix already hashed, so one per sheet costs about one pass over the pool.
+    """
+
+    __slots__ = ("pool", "_ends", "_hashers")
+
+    def __init__(self, pool: Sequence[str]) -> None:
+        self.pool = pool
+        self._ends = [0]
+        self._hashers = [hashlib.sha1()]
+
+    def digest(self, n: int) -> str:
+        i = bisect.bisect_right(self._ends, n) - 1
+        end = self._ends[i]
+        hasher = self._hashers[i].copy()
+        for text in self.pool[end:n]:
+            hasher.update(text.encode("utf-8"))
+            hasher.update(b"\x00")
+        if end != n:
+            self._ends.insert(i + 1, n)
+            self._hashers.insert(i + 1, hasher.copy())
+        return hasher.hexdigest()
+
+
+# A workbook path, its bytes (e.g. an upload held in memory) or a seekable binary stream
+WorkbookSource = Union[Path, str, bytes, bytearray, memoryview, IO[bytes]]
+
+
+class XlsxWorkbook:
+    """
+    Lazy handle on an .xlsx/.xlsm archive.
+
+    The zip is opened once and only workbook.xml and its rels are read up front. Sheet XML is
+    decompressed when a sheet is opened, and the shared-strings pool is loaded on first use.
+    Accepts a path, the workbook bytes or a seekable binary file object.
+    """
+
+    def __init__(self, source: WorkbookSource) -> None:
+        span = _profile_start()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        self._zf = zipfile.ZipFile(source, "r")
+        try:
+            self._rels = _read_workbook_rels(self._zf)
+            # (sheet_name, zip_entry_path) in workbook order
+            self.sheet_paths: List[Tuple[str, str]] = _resolve_workbook_sheet_paths(self._zf, self._rels)
+        except Exception:
+            self._zf.close()
+            raise
+        self._shared_strings: Optional[List[str]] = None
+        _profile_emit(span, "open_workbook", rows=len(self.sheet_paths))
+
+    def __enter__(self) -> "XlsxWorkbook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zf.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [name for name, _path in self.sheet_paths]
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """
+        Returns (sheet_name, zip_entry_path) for the requested sheets in workbook order (all if None).
+        Raises KeyError naming any sheet the workbook doesn't have.
+        """
+        if names is None:
+            return list(self.sheet_paths)
+        wanted = list(dict.fromkeys(names))
+        known = set(self.sheet_names)
+        missing = [n for n in wanted if n not in known]
+        if missing:
+            raise KeyError(f"sheet not found: {', '.join(missing)}")
+        wanted_set = set(wanted)
+        return [(name, path) for name, path in self.sheet_paths if name in wanted_set]
+
+    @property
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            span = _profile_start()
+            self._shared_strings = _load_shared_strings(self._zf, self._rels)
+            _profile_emit(span, "shared_strings", cells=len(self._shared_strings))
+        return self._shared_strings
+
+    def shared_strings_info(self) -> Optional[zipfile.ZipInfo]:
+        try:
+            return self._zf.getinfo(_shared_strings_path(self._rels))
+        except KeyError:
+            return None
+
+    def entry_info(self, sheet_path: str) -> zipfile.ZipInfo:
+        return self._zf.getinfo(sheet_path)
+
+    def open_entry(self, sheet_path: str) -> IO[bytes]:
+        return self._zf.open(sheet_path, "r")
+
+    def read_entry(self, sheet_path: str) -> bytes:
+        return self._zf.read(sheet_path)
+
+    def iter_sheets(self, names: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, IO[bytes]]]:
+        """
+        Yields (sheet_name, decompressing_stream) one sheet at a time; each stream is closed
+        when the next sheet is requested.
+        """
+        for sheet_name, sheet_path in self.select(names):
+            with self.open_entry(sheet_path) as stream:
+                yield sheet_name, stream
+
+
+# One row of a reader's stream: (row_number, [(col_letters, cleaned_text), ...]) for non-empty cells
+SheetRows = Iterator[Tuple[int, List[Tuple[str, str]]]]
+
+
+class WorkbookReader:
+    """
+    Streaming reader interface: every supported format is turned into the same per-sheet row
+    stream that _build_sheet_grid consumes, so the extractors never see the source format.
+
+    iter_sheets() yields (sheet_name, rows) in workbook order. Each sheet's rows must be read
+    (or abandoned) before asking for the next sheet; the underlying file is streamed once.
+    """
+
+    # Names the format in cache keys; set by subclasses
+    format = ""
+
+    def __enter__(self) -> "WorkbookReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        return None
+
+    @property
+    def sheet_names(self) -> List[str]:
+        raise NotImplementedError
+
+    def iter_sheets(
+        self, names: Optional[Iterable[str]] = None, columns: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[str, SheetRows]]:
+        """
+        Yields (sheet_name, rows) for the requested sheets (all if None). `columns` projects rows
+        to those column letters. Raises KeyError naming any sheet the workbook doesn't have.
+        """
+        raise NotImplementedError
+
+    def sheet_fingerprint(self, sheet_name: str) -> Optional[str]:
+        """
+        Cheap value that changes whenever the sheet may have changed (None: never cache it).
+        """
+        return None
+
+    def cache_stamp(self, sheet_name: str) -> Any:
+        """
+        JSON value stored with the sheet's cache entry once its rows have been read, for parts
+        the fingerprint leaves out (None: nothing to check).
+        """
+        return None
+
+    def stamp_matches(self, stamp: Any) -> bool:
+        """
+        Whether a cached entry with this stamp is still valid for the workbook as it is now.
+        """
+        return True
+
+
+class XlsxReader(WorkbookReader):
+    """
+    .xlsx/.xlsm reader over XlsxWorkbook: sheets stream straight from their zip entries, and the
+    shared strings are loaded when the first sheet is actually read (never if all are cached).
+
+    A sheet's fingerprint is its own zip entry. The shared strings are checked through the cache
+    stamp: the highest pool index the sheet reads and a hash of the pool up to it. Text added to
+    another tab (appended to the pool) therefore leaves the sheet's entry valid.
+    """
+
+    format = "xlsx"
+
+    def __init__(self, source: WorkbookSource) -> None:
+        self.workbook = XlsxWorkbook(source)
+        sst_info = self.workbook.shared_strings_info()
+        self._sst_signature = f"{sst_info.CRC:08x}:{sst_info.file_size}" if sst_info is not None else "-"
+        self._sheet_entries = dict(self.workbook.sheet_paths)
+        # sheet name -> highest shared-string index read while streaming it
+        self._max_index: Dict[str, int] = {}
+        self._prefixes: Optional[_SharedStringPrefixes] = None
+
+    def close(self) -> None:
+        self.workbook.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return self.workbook.sheet_names
+
+    def iter_sheets(
+        self, names: Optional[Iterable[str]] = None, columns: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[str, SheetRows]]:
+        for sheet_name, stream in self.workbook.iter_sheets(names):
+            yield sheet_name, self._sheet_rows(sheet_name, stream, columns)
+
+    def _sheet_rows(self, sheet_name: str, stream: IO[bytes], columns: Optional[AbstractSet[str]]) -> SheetRows:
+        refs = _SharedStringRefs(self.workbook.shared_strings)
+        yield from _iter_xlsx_sheet_rows(stream, refs, columns)
+        self._max_index[sheet_name] = refs.max_index
+
+    def sheet_fingerprint(self, sheet_name: str) -> Optional[str]:
+        info = self.workbook.entry_info(self._sheet_entries[sheet_name])
+        return f"{info.CRC:08x}:{info.file_size}"
+
+    def cache_stamp(self, sheet_name: str) -> Any:
+        max_index = self._max_index.get(sheet_name)
+        return self.shared_strings_stamp(max_index) if max_index is not None else None
+
+    def shared_strings_stamp(self, max_index: int) -> List[Any]:
+        """
+        [shared-strings CRC/size, highest index read, sha1 of the pool up to it] for a sheet
+        parsed against this workbook's pool.
+        """
+        digest = self._prefix_digest(max_index + 1) if max_index >= 0 else None
+        return [self._sst_signature, max_index, digest]
+
+    def stamp_matches(self, stamp: Any) -> bool:
+        if stamp is None:
+            return True
+        sst_signature, max_index, digest = stamp
+        # Unchanged pool, or a sheet that reads none of it: no need to load the pool
+        if sst_signature == self._sst_signature or max_index < 0:
+            return True
+        return max_index < len(self.workbook.shared_strings) and self._prefix_digest(max_index + 1) == digest
+
+    def _prefix_digest(self, n: int) -> str:
+        if self._prefixes is None:
+            self._prefixes = _SharedStringPrefixes(self.workbook.shared_strings)
+        return self._prefixes.digest(n)
+
+
+_ODS_MIMETYPE = b"application/vnd.oasis.opendocument.spreadsheet"
+_NS_ODS_TABLE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+_NS_ODS_TEXT = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+_NS_ODS_OFFICE = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+_TAG_ODS_SPREADSHEET = f"{{{_NS_ODS_OFFICE}}}spreadsheet"
+_TAG_ODS_TABLE = f"{{{_NS_ODS_TABLE}}}table"
+_TAG_ODS_ROW = f"{{{_NS_ODS_TABLE}}}table-row"
+_TAG_ODS_CELL = f"{{{_NS_ODS_TABLE}}}table-cell"
+_TAG_ODS_COVERED_CELL = f"{{{_NS_ODS_TABLE}}}covered-table-cell"
+_TAG_ODS_P = f"{{{_NS_ODS_TEXT}}}p"
+_TAG_ODS_S = f"{{{_NS_ODS_TEXT}}}s"
+_TAG_ODS_TAB = f"{{{_NS_ODS_TEXT}}}tab"
+_TAG_ODS_LINE_BREAK = f"{{{_NS_ODS_TEXT}}}line-break"
+_ATTR_ODS_NAME = f"{{{_NS_ODS_TABLE}}}name"
+_ATTR_ODS_ROWS_REPEATED = f"{{{_NS_ODS_TABLE}}}number-rows-repeated"
+_ATTR_ODS_COLS_REPEATED = f"{{{_NS_ODS_TABLE}}}number-columns-repeated"
+_ATTR_ODS_VALUE_TYPE = f"{{{_NS_ODS_OFFICE}}}value-type"
+_ATTR_ODS_TEXT_C = f"{{{_NS_ODS_TEXT}}}c"
+# Cells of these types carry their raw value in an attribute (the <text:p> is locale-formatted),
+# mirroring the raw <v> of an xlsx cell
+_ODS_VALUE_ATTRS = {
+    "float": f"{{{_NS_ODS_OFFICE}}}value",
+    "percentage": f"{{{_NS_ODS_OFFICE}}}value",
+    "currency": f"{{{_NS_ODS_OFFICE}}}value",
+    "date": f"{{{_NS_ODS_OFFICE}}}date-value",
+    "time": f"{{{_NS_ODS_OFFICE}}}time-value",
+}
+_ATTR_ODS_BOOLEAN = f"{{{_NS_ODS_OFFICE}}}boolean-value"
+# Same limit as Excel; bounds number-columns-repeated runs
+_MAX_COLUMNS = 16384
+
+
+@lru_cache(maxsize=_MAX_COLUMNS)
+def _column_letters(index: int) -> str:
+    """
+    1 -> "A", 26 -> "Z", 27 -> "AA".
+    """
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + ord(ch) - 64
+    return index
+
+
+def _ods_paragraph_text(el: ET.Element) -> str:
+    parts = [el.text or ""]
+    for child in el:
+        tag = child.tag
+        if tag == _TAG_ODS_S:
+            parts.append(" " * int(child.get(_ATTR_ODS_TEXT_C) or 1))
+        elif tag == _TAG_ODS_TAB:
+            parts.append("\t")
+        elif tag == _TAG_ODS_LINE_BREAK:
+            parts.append("\n")
+        else:
+            # <text:span>, <text:a>, ...
+            parts.append(_ods_paragraph_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _ods_cell_text(cell: ET.Element) -> Optional[str]:
+    value_type = cell.get(_ATTR_ODS_VALUE_TYPE)
+    attr = _ODS_VALUE_ATTRS.get(value_type) if value_type else None
+    if attr is not None:
+        return cell.get(attr)
+    if value_type == "boolean":
+        return "1" if cell.get(_ATTR_ODS_BOOLEAN) == "true" else "0"
+    # Direct <text:p> children only: annotations nest their own paragraphs
+    paragraphs = [_ods_paragraph_text(p) for p in cell if p.tag == _TAG_ODS_P]
+    return "\n".join(paragraphs) if paragraphs else None
+
+
+def _ods_repeat(el: ET.Element, attr: str) -> int:
+    # Malformed or non-positive repeat counts are read as 1, as spreadsheet apps do
+    try:
+        return max(int(el.get(attr) or 1), 1)
+    except ValueError:
+        return 1
+
+
+class _OdsTableRows:
+    """
+    Rows of one <table:table>, read from the content.xml event stream shared by every table,
+    like _iter_xlsx_sheet_rows. Repeated rows and cells are expanded only when they have content,
+    so the usual trailing `number-rows-repeated="1048000"` costs nothing.
+    """
+
+    __slots__ = ("_events", "_table", "_columns", "finished")
+
+    def __init__(
+        self, events: Iterator[Tuple[str, ET.Element]], table: ET.Element, columns: Optional[AbstractSet[str]]
+    ) -> None:
+        # `events` is positioned just after <table:table> started
+        self._events = events
+        self._table = table
+        self._columns = columns
+        self.finished = False
+
+    def __iter__(self) -> SheetRows:
+        columns = self._columns
+        table = self._table
+        last_col = max((_column_index(c) for c in columns), default=0) if columns is not None else _MAX_COLUMNS
+        cleaned: Dict[str, str] = {}
+        row_num = 0
+        for event, el in self._events:
+            if event != "end":
+                continue
+            tag = el.tag
+            if tag == _TAG_ODS_ROW:
+                repeat = _ods_repeat(el, _ATTR_ODS_ROWS_REPEATED)
+                row_cells: List[Tuple[str, str]] = []
+                col = 0
+                for cell in el:
+                    if col >= last_col:
+                        break
+                    if cell.tag != _TAG_ODS_CELL and cell.tag != _TAG_ODS_COVERED_CELL:
+                        continue
+                    span = _ods_repeat(cell, _ATTR_ODS_COLS_REPEATED)
+                    raw = _ods_cell_text(cell)
+                    if raw is not None:
+                        text_val = cleaned.get(raw)
+                        if text_val is None:
+                            text_val = cleaned[raw] = sys.intern(_clean_text(raw) or "")
+                        if text_val:
+                            for i in range(col + 1, min(col + span, last_col) + 1):
+                                letters = _column_letters(i)
+                                if columns is None or letters in columns:
+                                    row_cells.append((letters, text_val))
+                    col += span
+                if row_cells:
+                    for _ in range(repeat):
+                        row_num += 1
+                        yield row_num, row_cells
+                else:
+                    row_num += repeat
+                # Drop finished rows so memory stays bounded by one row, as for xlsx
+                el.clear()
+                table.clear()
+            elif tag == _TAG_ODS_TABLE and el is table:
+                self.finished = True
+                return
+
+    def skip(self) -> None:
+        """
+        Consumes whatever is left of the table, projected to no columns so no cell is decoded.
+        """
+        if not self.finished:
+            self._columns = frozenset()
+            for _ in self:
+                pass
+
+
+class OdsReader(WorkbookReader):
+    """
+    OpenDocument spreadsheet reader. All sheets live in content.xml, which is parsed as a single
+    stream; sheets that aren't requested, and whatever the caller leaves unread (e.g. a sheet
+    served from the cache), are skipped without decoding cells.
+    """
+
+    format = "ods"
+
+    def __init__(self, source: WorkbookSource) -> None:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        self._zf = zipfile.ZipFile(source, "r")
+        self._sheet_names: Optional[List[str]] = None
+
+    def close(self) -> None:
+        self._zf.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        if self._sheet_names is None:
+            names: List[str] = []
+            with self._zf.open("content.xml") as stream:
+                for _event, el in ET.iterparse(stream, events=("start",)):
+                    if el.tag == _TAG_ODS_TABLE:
+                        names.append(el.get(_ATTR_ODS_NAME) or f"Sheet{len(names) + 1}")
+            self._sheet_names = names
+        return self._sheet_names
+
+    def iter_sheets(
+        self, names: Optional[Iterable[str]] = None, columns: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[str, SheetRows]]:
+        wanted = list(dict.fromkeys(names)) if names is not None else None
+        seen: Set[str] = set()
+        n_tables = 0
+        with self._zf.open("content.xml") as stream:
+            events = ET.iterparse(stream, events=("start", "end"))
+            body: Optional[ET.Element] = None
+            for event, el in events:
+                if event != "start":
+                    continue
+                if el.tag == _TAG_ODS_SPREADSHEET:
+                    body = el
+                    continue
+                if el.tag != _TAG_ODS_TABLE:
+                    continue
+                n_tables += 1
+                sheet_name = el.get(_ATTR_ODS_NAME) or f"Sheet{n_tables}"
+                rows = _OdsTableRows(events, el, columns)
+                if wanted is None or sheet_name in wanted:
+                    seen.add(sheet_name)
+                    yield sheet_name, iter(rows)
+                rows.skip()
+                if body is not None:
+                    body.clear()
+        if wanted is not None:
+            missing = [n for n in wanted if n not in seen]
+            if missing:
+                raise KeyError(f"sheet not found: {', '.join(missing)}")
+
+    def sheet_fingerprint(self, sheet_name: str) -> Optional[str]:
+        # Every sheet is in content.xml, so any edit invalidates them all
+        info = self._zf.getinfo("content.xml")
+        return f"{info.CRC:08x}:{info.file_size}"
+
+
+CSV_SUFFIXES = (".csv", ".tsv")
+
+
+class CsvReader(WorkbookReader):
+    """
+    CSV/TSV exports: a directory of files (one sheet per file, named after the file, in natural
+    order) or a single file. .tsv files are tab-separated; for .csv the delimiter (",", ";" or tab) is guessed.
+    """
+
+    format = "csv"
+
+    def __init__(self, source: Union[Path, str]) -> None:
+        path = Path(source)
+        if path.is_dir():
+            # Natural order, so "Week 2" comes before "Week 10" as it would in the workbook
+            files = sorted(
+                (p for p in path.iterdir() if p.suffix.lower() in CSV_SUFFIXES and p.is_file()),
+                key=lambda p: [int(part) if part.isdigit() else part.lower() for part in _INT_RE.split(p.stem)],
+            )
+        else:
+            files = [path]
+        self._files: Dict[str, Path] = {p.stem: p for p in files}
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._files)
+
+    def iter_sheets(
+        self, names: Optional[Iterable[str]] = None, columns: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[str, SheetRows]]:
+        selected = self.sheet_names
+        if names is not None:
+            wanted = list(dict.fromkeys(names))
+            missing = [n for n in wanted if n not in self._files]
+            if missing:
+                raise KeyError(f"sheet not found: {', '.join(missing)}")
+            selected = [n for n in selected if n in set(wanted)]
+        for sheet_name in selected:
+            yield sheet_name, _iter_csv_rows(self._files[sheet_name], columns)
+
+    def sheet_fingerprint(self, sheet_name: str) -> Optional[str]:
+        # The file's content: two exports of the same sheet name can share size and mtime
+        digest = hashlib.sha1()
+        with self._files[sheet_name].open("rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _sniff_delimiter(sample: str) -> str:
+    """
+    Picks ",", ";" or tab: whichever separates cells on the most lines, then the most often.
+
+    csv.Sniffer gives up on coach exports, where most rows are a single label and locales that
+    write decimal commas ("62,5 kg") separate cells with ";".
+    """
+    lines = sample.splitlines()[:200]
+    best = ","
+    best_score = (0, 0)
+    for delimiter in (",", ";", "\t"):
+        score = (sum(1 for line in lines if delimiter in line), sum(line.count(delimiter) for line in lines))
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _iter_csv_rows(path: Path, columns: Optional[AbstractSet[str]]) -> SheetRows:
+    last_col = max((_column_index(c) for c in columns), default=0) if columns is not None else _MAX_COLUMNS
+    cleaned: Dict[str, str] = {}
+    # utf-8-sig drops the BOM Excel writes; undecodable bytes are replaced rather than fatal
+    with path.open("r", encoding="utf-8-sig", errors="replace", newline="") as fp:
+        if path.suffix.lower() == ".tsv":
+            delimiter = "\t"
+        else:
+            delimiter = _sniff_delimiter(fp.read(64 * 1024))
+            fp.seek(0)
+        for row_num, record in enumerate(csv.reader(fp, delimiter=delimiter), start=1):
+            row_cells: List[Tuple[str, str]] = []
+            for i, raw in enumerate(record[:last_col], start=1):
+                if not raw:
+                    continue
+                text_val = cleaned.get(raw)
+                if text_val is None:
+                    text_val = cleaned[raw] = sys.intern(_clean_text(raw) or "")
+                if text_val:
+                    letters = _column_letters(i)
+                    if columns is None or letters in columns:
+                        row_cells.append((letters, text_val))
+            if row_cells:
+                yield row_num, row_cells
+
+
+# Pluggable: format name -> reader factory, and file suffix -> format name
+_READER_FACTORIES: Dict[str, Callable[[WorkbookSource], WorkbookReader]] = {
+    "xlsx": XlsxReader,
+    "ods": OdsReader,
+    "csv": CsvReader,  # type: ignore[dict-item]
+}
+_READER_SUFFIXES: Dict[str, str] = {".xlsx": "xlsx", ".xlsm": "xlsx", ".ods": "ods", ".csv": "csv", ".tsv": "csv"}
+
+
+def register_reader(fmt: str, factory: Callable[[WorkbookSource], WorkbookReader], suffixes: Iterable[str] = ()) -> None:
+    """
+    Adds (or replaces) the reader for `fmt` and maps file suffixes such as ".xls" to it.
+    """
+    _READER_FACTORIES[fmt] = factory
+    for suffix in suffixes:
+        _READER_SUFFIXES[suffix.lower()] = fmt
+
+
+def workbook_suffixes() -> List[str]:
+    """
+    File suffixes of single-file workbook formats, used to collect workbooks in batch mode.
+    """
+    return [suffix for suffix, fmt in _READER_SUFFIXES.items() if fmt != "csv"]
+
+
+def detect_workbook_format(source: WorkbookSource) -> str:
+    """
+    Format name for a path (by suffix; a directory is a CSV/TSV export) or for in-memory bytes
+    or a stream (by content: ODS zips start with their mimetype entry). Defaults to "xlsx".
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.is_dir():
+            return "csv"
+        return _READER_SUFFIXES.get(path.suffix.lower(), "xlsx")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:100])
+    else:
+        pos = source.tell()
+        head = source.read(100)
+        source.seek(pos)
+    # The first zip entry of an ODS file is an uncompressed "mimetype" holding the media type
+    return "ods" if head[30:38] == b"mimetype" and _ODS_MIMETYPE in head else "xlsx"
+
+
+def open_workbook_reader(source: WorkbookSource) -> WorkbookReader:
+    return _READER_FACTORIES[detect_workbook_format(source)](source)
+
+
+# Row kinds produced by the section scanner. Kinds are mutually exclusive (they are decided by the
+# start of column A); warmup/main headers are substring matches and are carried as separate flags.
+# The values double as the group names in _ROW_KIND_RE.
+ROW_DAY_HEADER = "day_header"
+ROW_TABLE_HEADER = "table_header"
+ROW_COOLDOWN = "cooldown"
+ROW_MINUTE_A = "minute_a"
+ROW_MINUTE_B = "minute_b"
+ROW_EXTRA = "extra"
+ROW_STATION = "station"
+ROW_EXERCISE = "exercise"
+
+@dataclass
+class RowEvent:
+    __slots__ = (
+        "row",
+        "kind",
+        "a",
+        "b",
+        "label",
+        "order",
+        "day",
+        "is_warmup_header",
+        "is_main_header",
+        "emom_minutes",
+    )
+
+    row: int
+    kind: str
+    a: str
+    b: Optional[str]
+    # Minuto A/B, Extra and station label with its prefix stripped
+    label: Optional[str]
+    # Station number for ROW_STATION
+    order: Optional[int]
+    # (day_number, normalized_header) for ROW_DAY_HEADER
+    day: Optional[Tuple[int, str]]
+    is_warmup_header: bool
+    is_main_header: bool
+    # First "EMOM <n> MIN" found in the cell
+    emom_minutes: Optional[int]
+
+
+def _classify_row(row: int, a: str, b: Optional[str]) -> RowEvent:
+    kind = ROW_EXERCISE
+    label: Optional[str] = None
+    order: Optional[int] = None
+    day: Optional[Tuple[int, str]] = None
+
+    m = _ROW_KIND_RE.match(a)
+    if m is not None:
+        kind = m.lastgroup or ROW_EXERCISE
+        if kind == ROW_DAY_HEADER:
+            day_num = int(m.group("day_num"))
+            day = day_num, f"DAY {day_num} - {m.group('day_rest').strip()}"
+        elif kind == ROW_MINUTE_A:
+            label = _extract_after_colon_or_strip_prefix(a, _MINUTE_A_PREFIX_RE)
+        elif kind == ROW_MINUTE_B:
+            label = _extract_after_colon_or_strip_prefix(a, _MINUTE_B_PREFIX_RE)
+        elif kind == ROW_EXTRA:
+            label = _extract_after_colon_or_strip_prefix(a, _EXTRA_PREFIX_RE)
+        elif kind == ROW_STATION:
+            order = int(m.group("station_order"))
+            label = m.group("station_label").strip()
+
+    up = a.upper()
+    emom_minutes: Optional[int] = None
+    if "EMOM" in up:
+        m = _EMOM_MINUTES_RE.search(a)
+        if m:
+            emom_minutes = int(m.group(1))
+
+    return RowEvent(
+        row=row,
+        kind=kind,
+        a=a,
+        b=b,
+        label=label,
+        order=order,
+        day=day,
+        is_warmup_header="RISCALDAMENTO" in up,
+        is_main_header="ALLENAMENTO PRINCIPALE" in up,
+        emom_minutes=emom_minutes,
+    )
+
+
+def _scan_rows(grid: SheetGrid, start_row: int, end_row: int) -> Iterator[RowEvent]:
+    """
+    Single pass over column A in [start_row, end_row]: every non-empty row is classified exactly once.
+    Rows with an empty column A carry nothing the extractors use and are not emitted.
+    """
+    for r, a in grid.iter_column("A", start_row, end_row):
+        yield _classify_row(r, a, grid.col_b(r))
+
+
+class _WarmupCollector:
+    """
+    Collects label/target rows between the first RISCALDAMENTO header and the first
+    ALLENAMENTO PRINCIPALE header. Yields nothing unless both headers appear in that order.
+    """
+
+    __slots__ = ("header_row", "done", "valid", "items")
+
+    def __init__(self) -> None:
+        self.header_row: Optional[int] = None
+        self.done = False
+        self.valid = False
+        self.items: List[Dict[str, str]] = []
+
+    def feed(self, ev: RowEvent) -> None:
+        if self.done:
+            return
+        if self.header_row is None and ev.is_warmup_header:
+            self.header_row = ev.row
+        if ev.is_main_header:
+            self.done = True
+            self.valid = self.header_row is not None and ev.row > self.header_row
+            return
+        if self.header_row is None or ev.row <= self.header_row or not ev.b:
+            return
+        # Skip column header rows if they appear
+        if ev.kind == ROW_TABLE_HEADER:
+            return
+        self.items.append({"label": ev.a, "target": ev.b})
+
+    def result(self) -> List[Dict[str, str]]:
+        return self.items if self.valid else []
+
+
+class _StrengthSection:
+    def __init__(self, grid: SheetGrid, start_row: int, workout_name: str) -> None:
+        self.grid = grid
+        self.start_row = start_row
+        self.workout_name = workout_name
+        # Fallback: assume table starts right after title row, until an EXERCISE SELECTION header shows up
+        self.header_row = start_row + 1
+        self.header_found = False
+        self.stopped = False
+        self.exercises: List[Dict] = []
+
+    def feed(self, ev: RowEvent) -> None:
+        r = ev.row
+        if r <= self.start_row:
+            return
+        if (
+            not self.header_found
+            and r <= self.start_row + 6
+            and ev.kind == ROW_TABLE_HEADER
+            and ev.a.strip().upper() == "EXERCISE SELECTION"
+        ):
+            # Rows read under the fallback header don't belong to the table
+            self.header_found = True
+            self.header_row = r
+            self.exercises = []
+            self.stopped = False
+            return
+        if self.stopped or r <= self.header_row:
+            return
+        if ev.kind == ROW_COOLDOWN or ev.kind == ROW_DAY_HEADER:
+            self.stopped = True
+            return
+
+        grid = self.grid
+        name = ev.a
+        reps = grid.get_int(r, "C")
+        sets = grid.get_int(r, "D")
         if not name or reps is None or sets is None:
-            continue
+            return
 
-        weight_num = _parse_number(grid.get(r, "B"))
+        weight_num = _parse_clean_number(ev.b) if ev.b else None
         ex = {"name": name, "sets": sets, "reps": reps}
         if weight_num is not None:
             # Importer expects weight to be a number >= 0
             ex["weight"] = weight_num
-        exercises.append(ex)
+        self.exercises.append(ex)
+
+    def result(self) -> Dict:
+        return {
+            "id": _slugify(self.workout_name),
+            "name": self.workout_name,
+            "type": "strength",
+            "exercises": self.exercises,
+        }
+
+
+class _EmomSection:
+    def __init__(self, grid: SheetGrid, start_row: int, workout_name: str) -> None:
+        self.workout_name = workout_name
+        self.duration: Optional[int] = None
+        self.warmup = _WarmupCollector()
+        self.minute_a: List[Dict[str, str]] = []
+        self.minute_b: List[Dict[str, str]] = []
+        self.extras: List[Dict[str, str]] = []
+
+    def feed(self, ev: RowEvent) -> None:
+        self.warmup.feed(ev)
+        if self.duration is None and ev.emom_minutes is not None:
+            self.duration = ev.emom_minutes
+        if ev.is_main_header:
+            # Minute rows are read from the last main header onwards
+            self.minute_a = []
+            self.minute_b = []
+            self.extras = []
+        if not ev.b:
+            return
+        if ev.kind == ROW_MINUTE_A:
+            self.minute_a.append({"label": ev.label, "target": ev.b})
+        elif ev.kind == ROW_MINUTE_B:
+            self.minute_b.append({"label": ev.label, "target": ev.b})
+        elif ev.kind == ROW_EXTRA:
+            self.extras.append({"label": ev.label, "target": ev.b})
+
+    def result(self) -> Dict:
+        # Importer requires durationMinutes > 0 and non-empty minuteA/minuteB arrays
+        return {
+            "id": _slugify(self.workout_name),
+            "name": self.workout_name,
+            "type": "emom",
+            "exercises": [],
+            "durationMinutes": self.duration or 1,
+            "warmup": self.warmup.result() or None,
+            "minuteA": self.minute_a,
+            "minuteB": self.minute_b,
+            "extras": self.extras or None,
+        }
+
+
+class _CircuitSection:
+    def __init__(self, grid: SheetGrid, start_row: int, workout_name: str) -> None:
+        self.workout_name = workout_name
+        self.rounds: Optional[int] = None
+        self.rest_seconds: Optional[int] = None
+        self.warmup = _WarmupCollector()
+        self.stations: List[Dict] = []
+
+    def feed(self, ev: RowEvent) -> None:
+        self.warmup.feed(ev)
+        if ev.is_main_header:
+            m_rounds = _ROUNDS_RE.search(ev.a)
+            if m_rounds:
+                self.rounds = int(m_rounds.group(1))
+            m_rest = _REST_SECONDS_RE.search(ev.a)
+            if m_rest:
+                self.rest_seconds = int(m_rest.group(1))
+            # Stations are read from the last main header onwards
+            self.stations = []
+        if ev.kind == ROW_STATION and ev.b:
+            self.stations.append({"order": ev.order, "label": ev.label, "target": ev.b})
+
+    def result(self) -> Dict:
+        return {
+            "id": _slugify(self.workout_name),
+            "name": self.workout_name,
+            "type": "circuit",
+            "exercises": [],
+            "rounds": self.rounds or 1,
+            "restBetweenRoundsSeconds": self.rest_seconds,
+            "warmup": self.warmup.result() or None,
+            "stations": self.stations,
+        }
+
+
+_SECTION_BUILDERS = {
+    "strength": _StrengthSection,
+    "emom": _EmomSection,
+    "circuit": _CircuitSection,
+}
+
+
+def _run_section(builder, wtype: str, grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
+    span = _profile_start()
+    rows = 0
+    for ev in _scan_rows(grid, start_row, end_row):
+        builder.feed(ev)
+        rows += 1
+    tpl = builder.result()
+    _profile_emit(span, f"extract_{wtype}", grid.name, workout_name, rows=rows)
+    return tpl
 
-    return {
-        "id": _slugify(workout_name),
-        "name": workout_name,
-        "type": "strength",
-        "exercises": exercises,
-    }
+
+def extract_strength_workout(grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
+    builder = _StrengthSection(grid, start_row, workout_name)
+    return _run_section(builder, "strength", grid, start_row, end_row, workout_name)
 
 
 def extract_emom_workout(grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
-    duration = None
-    main_header_row = None
-    for r in grid.iter_rows(start_row, end_row):
-        a = grid.col_a(r)
-        if not a:
-            continue
-        m = re.search(r"EMOM\s+(\d+)\s*MIN", a, flags=re.IGNORECASE)
-        if m and duration is None:
-            duration = int(m.group(1))
-        if "ALLENAMENTO PRINCIPALE" in a.upper():
-            main_header_row = r
-
-    warmup = _extract_warmup(grid, start_row, end_row)
-
-    minute_a: List[Dict[str, str]] = []
-    minute_b: List[Dict[str, str]] = []
-    extras: List[Dict[str, str]] = []
-
-    scan_start = (main_header_row or start_row)
-    for r in grid.iter_rows(scan_start, end_row):
-        a = grid.col_a(r)
-        b = grid.col_b(r)
-        if not a or not b:
+    builder = _EmomSection(grid, start_row, workout_name)
+    return _run_section(builder, "emom", grid, start_row, end_row, workout_name)
+
+
+def extract_circuit_workout(grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
+    builder = _CircuitSection(grid, start_row, workout_name)
+    return _run_section(builder, "circuit", grid, start_row, end_row, workout_name)
+
+
+class ExtractedTemplate(NamedTuple):
+    workout_type: str
+    template: Dict
+    # Where the section starts: sheet name and the row of its day header
+    sheet: str
+    row: int
+
+
+def _iter_sheet_templates(grid: SheetGrid) -> Iterator[ExtractedTemplate]:
+    """
+    Yields an ExtractedTemplate for every day section in the sheet, in row order, as soon
+    as the section is complete.
+
+    The sheet is scanned once: each day header opens a section builder and every following row
+    is fed to it until the next day header, so conversion is O(rows).
+    """
+    sheet_name = grid.name
+    current = None
+    current_type = ""
+    current_row = 0
+    current_name = ""
+    current_rows = 0
+    span = None
+
+    for ev in _scan_rows(grid, 1, grid.max_row):
+        if ev.kind == ROW_DAY_HEADER:
+            if current is not None:
+                tpl = current.result()
+                _profile_emit(span, f"extract_{current_type}", sheet_name, current_name, rows=current_rows)
+                yield ExtractedTemplate(current_type, tpl, sheet_name, current_row)
+            span = _profile_start()
+            current_row = ev.row
+            current_rows = 0
+            _day_num, normalized_header = ev.day
+            current_name = f"{sheet_name} - {normalized_header}"
+            current_type = _section_type_from_name(current_name)
+            current = _SECTION_BUILDERS.get(current_type, _StrengthSection)(grid, ev.row, current_name)
+        if current is not None:
+            current.feed(ev)
+            current_rows += 1
+
+    if current is not None:
+        tpl = current.result()
+        _profile_emit(span, f"extract_{current_type}", sheet_name, current_name, rows=current_rows)
+        yield ExtractedTemplate(current_type, tpl, sheet_name, current_row)
+
+
+def _extract_sheet_templates(grid: SheetGrid) -> List[ExtractedTemplate]:
+    """
+    Returns an ExtractedTemplate for every day section in the sheet, in row order.
+    """
+    return list(_iter_sheet_templates(grid))
+
+
+def _convert_sheet(
+    sheet_name: str, xml_source: Union[bytes, IO[bytes]], shared_strings: Optional[Sequence[str]]
+) -> Tuple[List[ExtractedTemplate], int]:
+    """
+    Converts one sheet's XML; also returns the highest shared-string index it read (-1: none),
+    for XlsxReader.shared_strings_stamp().
+    """
+    refs = _SharedStringRefs(shared_strings if shared_strings is not None else [])
+    grid = _parse_xlsx_sheet_xml(sheet_name, xml_source, refs, EXTRACTOR_COLUMNS)
+    return _extract_sheet_templates(grid), refs.max_index
+
+
+# Set once per pool worker by _init_sheet_worker so the pool isn't pickled with every sheet
+_WORKER_SHARED_STRINGS: Optional[List[str]] = None
+_WORKER_PROFILE = False
+
+
+def _init_sheet_worker(shared_strings: List[str], profile: bool = False, track_memory: bool = False) -> None:
+    global _WORKER_SHARED_STRINGS, _WORKER_PROFILE
+    _WORKER_SHARED_STRINGS = shared_strings
+    _WORKER_PROFILE = profile
+    if track_memory:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _capture_profile_events(fn: Callable[[], Any], enabled: bool) -> Tuple[Any, List[ProfileEvent]]:
+    """
+    Runs fn() in a worker process, collecting the profile events it emits so the parent can
+    replay them to its own hooks.
+    """
+    if not enabled:
+        return fn(), []
+    events: List[ProfileEvent] = []
+    register_profile_hook(events.append)
+    try:
+        return fn(), events
+    finally:
+        unregister_profile_hook(events.append)
+
+
+def _convert_sheet_worker(
+    sheet_name: str, xml_bytes: bytes
+) -> Tuple[Tuple[List[ExtractedTemplate], int], List[ProfileEvent]]:
+    return _capture_profile_events(
+        lambda: _convert_sheet(sheet_name, xml_bytes, _WORKER_SHARED_STRINGS), _WORKER_PROFILE
+    )
+
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Bump when the cached payload layout changes
+_CACHE_FORMAT = 3
+_CONVERTER_FINGERPRINT: Optional[str] = None
+
+
+def _converter_fingerprint() -> str:
+    # Any edit to this file invalidates cached sheets, so extractor changes never serve stale output
+    global _CONVERTER_FINGERPRINT
+    if _CONVERTER_FINGERPRINT is None:
+        try:
+            source = Path(__file__).read_bytes()
+        except OSError:
+            source = b""
+        _CONVERTER_FINGERPRINT = hashlib.sha1(source).hexdigest()
+    return _CONVERTER_FINGERPRINT
+
+
+def _default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "workout-converter"
+
+
+class SheetCache:
+    """
+    On-disk cache of extracted templates per sheet, one JSON file per entry.
+
+    Entries are keyed by the reader's format, the sheet name and its sheet_fingerprint() (for
+    .xlsx, the CRC32/size recorded in the zip directory for the sheet), so an unchanged sheet is
+    recognised without being decompressed. Each entry also stores the reader's cache_stamp(),
+    which get() checks with the reader's stamp_matches(). Hits refresh the file mtime; `evict()` drops least recently used entries until
+    the directory fits in `max_bytes`.
+    """
+
+    __slots__ = ("directory", "max_bytes", "hits", "misses", "_dirty")
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.directory = Path(directory) if directory is not None else _default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    @staticmethod
+    def source_key(fmt: str, sheet_name: str, fingerprint: str) -> str:
+        """
+        Key for a sheet read through a WorkbookReader, from its format and sheet_fingerprint().
+        """
+        parts = [str(_CACHE_FORMAT), _converter_fingerprint(), fmt, sheet_name, fingerprint]
+        return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Tuple[List[ExtractedTemplate], Any]]:
+        """
+        (templates, stamp) stored under key, or None; not counted as a hit or miss.
+        """
+        path = self._entry_path(key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            entry = [ExtractedTemplate(*item) for item in payload["templates"]], payload["stamp"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return entry
+
+    def get(
+        self, key: str, stamp_matches: Optional[Callable[[Any], bool]] = None
+    ) -> Optional[List[ExtractedTemplate]]:
+        """
+        Cached templates for key, or None if there are none or `stamp_matches` rejects their stamp.
+        """
+        entry = self.load(key)
+        if entry is None or (stamp_matches is not None and not stamp_matches(entry[1])):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, sheet_templates: List[ExtractedTemplate], stamp: Any = None) -> None:
+        path = self._entry_path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent workers never read a half-written entry
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            payload = {"stamp": stamp, "templates": sheet_templates}
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._dirty = True
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the cache fits in max_bytes. Returns the number removed.
+        """
+        if not self._dirty:
+            return 0
+        self._dirty = False
+        entries = []
+        total = 0
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError:
+            return 0
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+class MemorySheetCache:
+    """
+    In-process LRU of extracted templates per sheet, with the same interface as SheetCache.
+
+    Used by long-lived processes (--watch) so an unchanged sheet costs a dict lookup. Misses fall
+    through to `backing` (usually the on-disk cache) and puts are written to both.
+    """
+
+    __slots__ = ("backing", "max_entries", "hits", "misses", "_entries")
+
+    def __init__(self, backing: Optional[SheetCache] = None, max_entries: int = 4096) -> None:
+        self.backing = backing
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # key -> (templates, stamp)
+        self._entries: "OrderedDict[str, Tuple[List[ExtractedTemplate], Any]]" = OrderedDict()
+
+    def get(
+        self, key: str, stamp_matches: Optional[Callable[[Any], bool]] = None
+    ) -> Optional[List[ExtractedTemplate]]:
+        entry = self._entries.get(key)
+        if entry is None and self.backing is not None:
+            entry = self.backing.load(key)
+            if entry is not None:
+                self._entries[key] = entry
+        if entry is None or (stamp_matches is not None and not stamp_matches(entry[1])):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, sheet_templates: List[ExtractedTemplate], stamp: Any = None) -> None:
+        self._entries[key] = (sheet_templates, stamp)
+        self._entries.move_to_end(key)
+        if self.backing is not None:
+            self.backing.put(key, sheet_templates, stamp)
+
+    def evict(self) -> int:
+        removed = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            removed += 1
+        if self.backing is not None:
+            self.backing.evict()
+        return removed
+
+
+def iter_excel_templates(
+    xlsx_path: WorkbookSource,
+    jobs: int = 1,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+) -> Iterator[ExtractedTemplate]:
+    """
+    Yields an ExtractedTemplate for every day section of every sheet, in workbook order.
+    `xlsx_path` may also be the workbook bytes or a seekable binary stream, or any other format
+    open_workbook_reader() knows (.ods, CSV/TSV exports).
+
+    The workbook is streamed through its reader one sheet at a time; on the uncached path each
+    template is yielded as soon as its section has been read, so callers can write it out before
+    the rest of the sheet is parsed.
+
+    With jobs > 1, the sheets of an .xlsx/.xlsm are parsed and extracted in a process pool (one
+    task per sheet) and the results are yielded back in workbook order, so the output is
+    identical to the serial path. Each sheet's XML is read into memory up front to be sent to the
+    workers.
+
+    With a cache, sheets whose fingerprint is unchanged are served from it without being
+    decompressed, and shared strings are only loaded if some sheet has to be parsed.
+
+    `sheets` limits conversion to the named sheets (KeyError if one is missing); the other
+    tabs are never decompressed.
+    """
+    if jobs <= 1 or not _ships_xlsx_sheets(xlsx_path):
+        with open_workbook_reader(xlsx_path) as reader:
+            yield from _iter_reader_templates(reader, cache, sheets)
+        return
+
+    with XlsxReader(xlsx_path) as reader:
+        wb = reader.workbook
+        sheet_paths = wb.select(sheets)
+
+        cached: List[Optional[List[ExtractedTemplate]]] = [None] * len(sheet_paths)
+        keys: List[Optional[str]] = [None] * len(sheet_paths)
+        if cache is not None:
+            for i, (sheet_name, _sheet_path) in enumerate(sheet_paths):
+                keys[i] = _reader_cache_key(reader, sheet_name)
+                cached[i] = cache.get(keys[i], reader.stamp_matches)
+        pending = [i for i, res in enumerate(cached) if res is None]
+
+        pool = None
+        futures = {}
+        if len(pending) > 1:
+            import tracemalloc
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Shared strings are loaded once per workbook and reused by every sheet
+            pool = ProcessPoolExecutor(
+                max_workers=min(jobs, len(pending)),
+                initializer=_init_sheet_worker,
+                initargs=(wb.shared_strings, bool(_PROFILE_HOOKS), tracemalloc.is_tracing()),
+            )
+        try:
+            if pool is not None:
+                futures = {
+                    i: pool.submit(_convert_sheet_worker, sheet_paths[i][0], wb.read_entry(sheet_paths[i][1]))
+                    for i in pending
+                }
+            for i, (sheet_name, sheet_path) in enumerate(sheet_paths):
+                sheet_templates = cached[i]
+                if sheet_templates is None:
+                    if pool is None:
+                        # A single sheet to parse isn't worth starting a pool for
+                        with wb.open_entry(sheet_path) as sheet_stream:
+                            sheet_templates, max_index = _convert_sheet(sheet_name, sheet_stream, wb.shared_strings)
+                    else:
+                        (sheet_templates, max_index), events = futures.pop(i).result()
+                        for event in events:
+                            _dispatch_profile_event(event)
+                    if cache is not None:
+                        cache.put(keys[i], sheet_templates, reader.shared_strings_stamp(max_index))
+                yield from sheet_templates
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if cache is not None:
+            cache.evict()
+
+
+def _ships_xlsx_sheets(source: WorkbookSource) -> bool:
+    """
+    True when `source` is read by the built-in XlsxReader, whose sheet XML can be sent to worker
+    processes; every other reader (including a registered replacement) streams in-process.
+    """
+    return detect_workbook_format(source) == "xlsx" and _READER_FACTORIES.get("xlsx") is XlsxReader
+
+
+def _reader_cache_key(reader: WorkbookReader, sheet_name: str) -> Optional[str]:
+    fingerprint = reader.sheet_fingerprint(sheet_name)
+    if fingerprint is None:
+        return None
+    return SheetCache.source_key(reader.format, sheet_name, fingerprint)
+
+
+def _iter_reader_templates(
+    reader: WorkbookReader, cache: Optional[SheetCache] = None, sheets: Optional[Sequence[str]] = None
+) -> Iterator[ExtractedTemplate]:
+    """
+    Serial conversion through any WorkbookReader. Cached sheets are skipped by the reader
+    instead of being turned into a grid.
+    """
+    for sheet_name, rows in reader.iter_sheets(sheets, frozenset(EXTRACTOR_COLUMNS)):
+        key = _reader_cache_key(reader, sheet_name) if cache is not None else None
+        if key is None:
+            yield from _iter_sheet_templates(_build_sheet_grid(sheet_name, rows))
             continue
+        sheet_templates = cache.get(key, reader.stamp_matches)
+        if sheet_templates is None:
+            sheet_templates = _extract_sheet_templates(_build_sheet_grid(sheet_name, rows))
+            cache.put(key, sheet_templates, reader.cache_stamp(sheet_name))
+        yield from sheet_templates
+    if cache is not None:
+        cache.evict()
+
+
+def convert_excel_to_json(
+    xlsx_path: WorkbookSource,
+    jobs: int = 1,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Converts every day section of every sheet into a template, in workbook order, and returns
+    the templates with per-type counts. See iter_excel_templates for the options.
+    """
+    templates: List[Dict] = []
+    counts = {"strength": 0, "emom": 0, "circuit": 0}
+    for item in iter_excel_templates(xlsx_path, jobs=jobs, cache=cache, sheets=sheets):
+        templates.append(item.template)
+        counts[item.workout_type] = counts.get(item.workout_type, 0) + 1
+    return templates, counts
 
-        if re.match(r"^\s*Minuto\s*A\b", a, flags=re.IGNORECASE):
-            label = _extract_after_colon_or_strip_prefix(a, r"^\s*Minuto\s*A\b.*?\)\s*")
-            minute_a.append({"label": label, "target": b})
-        elif re.match(r"^\s*Minuto\s*B\b", a, flags=re.IGNORECASE):
-            label = _extract_after_colon_or_strip_prefix(a, r"^\s*Minuto\s*B\b.*?\)\s*")
-            minute_b.append({"label": label, "target": b})
-        elif re.match(r"^\s*Extra\s*:", a, flags=re.IGNORECASE):
-            label = _extract_after_colon_or_strip_prefix(a, r"^\s*Extra\s*:\s*")
-            extras.append({"label": label, "target": b})
-
-    # Importer requires durationMinutes > 0 and non-empty minuteA/minuteB arrays
-    return {
-        "id": _slugify(workout_name),
-        "name": workout_name,
-        "type": "emom",
-        "exercises": [],
-        "durationMinutes": duration or 1,
-        "warmup": warmup or None,
-        "minuteA": minute_a,
-        "minuteB": minute_b,
-        "extras": extras or None,
-    }
 
+# Integer <v> values in sheet XML: every shared-string reference (and some numeric cells)
+_CELL_INT_VALUE_RE = re.compile(rb"<(?:\w+:)?v(?:\s[^>]*)?>\s*(\d+)\s*<")
 
-def extract_circuit_workout(grid: SheetGrid, start_row: int, end_row: int, workout_name: str) -> Dict:
-    rounds = None
-    rest_seconds = None
-    main_header_row = None
 
-    for r in grid.iter_rows(start_row, end_row):
-        a = grid.col_a(r)
-        if not a:
+class _SharedStringSubsetMiss(LookupError):
+    """
+    Raised by a _SharedStringSubset read outside the entries it was built with.
+    """
+
+
+class _SharedStringSubset:
+    """
+    The shared strings one sheet can reference, sent to a worker instead of the whole pool. Built
+    from every integer <v> in the sheet XML, which covers its shared-string cells; a read that
+    still misses raises _SharedStringSubsetMiss so the caller can retry with the full pool.
+    """
+
+    __slots__ = ("entries", "size")
+
+    def __init__(self, pool: Sequence[str], xml_bytes: bytes) -> None:
+        self.size = len(pool)
+        self.entries: Dict[int, str] = {}
+        for m in _CELL_INT_VALUE_RE.finditer(xml_bytes):
+            i = int(m.group(1))
+            if i < self.size:
+                self.entries[i] = pool[i]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError(i)
+        try:
+            return self.entries[i]
+        except KeyError:
+            raise _SharedStringSubsetMiss(i) from None
+
+
+def _prepare_sheet_tasks(
+    source: WorkbookSource, cache: Optional[SheetCache] = None, sheets: Optional[Sequence[str]] = None
+) -> Tuple[
+    List[Tuple[str, Optional[str], Optional[List[ExtractedTemplate]], Optional[bytes], Optional[_SharedStringSubset]]],
+    List[str],
+    Callable[[int], Any],
+]:
+    """
+    Reads what a process pool needs to convert a workbook: per sheet (name, cache key, cached
+    templates, and when not cached its XML bytes and the shared strings it references), the
+    whole pool ([] if every sheet is cached) and the function that stamps a parsed sheet's cache
+    entry from its highest shared-string index.
+
+    Only a sheet's subset of the pool is pickled with its task, since a caller-supplied executor
+    can't be given the pool once per worker the way iter_excel_templates does.
+    """
+    tasks = []
+    with XlsxReader(source) as reader:
+        wb = reader.workbook
+        for sheet_name, sheet_path in wb.select(sheets):
+            key = None
+            cached = None
+            if cache is not None:
+                key = _reader_cache_key(reader, sheet_name)
+                cached = cache.get(key, reader.stamp_matches)
+            if cached is not None:
+                tasks.append((sheet_name, key, cached, None, None))
+                continue
+            xml_bytes = wb.read_entry(sheet_path)
+            tasks.append((sheet_name, key, None, xml_bytes, _SharedStringSubset(wb.shared_strings, xml_bytes)))
+        shared_strings = wb.shared_strings if any(t[3] is not None for t in tasks) else []
+    # The pool is loaded whenever a sheet needs stamping, so the stamp works on the closed reader
+    return tasks, shared_strings, reader.shared_strings_stamp
+
+
+async def aiter_excel_templates(
+    xlsx_path: WorkbookSource,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+    executor: Optional["Executor"] = None,
+) -> AsyncIterator[ExtractedTemplate]:
+    """
+    Async counterpart of iter_excel_templates for event-loop services: all parsing runs in
+    `executor`, so a large workbook never blocks the loop.
+
+    With a thread executor (the default: the loop's own), the streaming converter runs there and
+    each template is yielded as soon as its section has been read. With a ProcessPoolExecutor,
+    the sheets of an .xlsx/.xlsm are parsed in parallel worker processes and yielded per sheet, in
+    workbook order; other formats are streamed on the loop's thread pool instead.
+    """
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor) and not _ships_xlsx_sheets(xlsx_path):
+        # Per-sheet tasks need the xlsx sheet XML; a reader's row stream can't be sent to a worker
+        executor = None
+    if isinstance(executor, ProcessPoolExecutor):
+        # Unzipping and cache lookups are I/O-bound, so they stay on the loop's thread pool
+        tasks, shared_strings, stamp = await loop.run_in_executor(
+            None, _prepare_sheet_tasks, xlsx_path, cache, sheets
+        )
+        futures = [
+            loop.run_in_executor(executor, _convert_sheet, sheet_name, xml_bytes, subset)
+            if xml_bytes is not None
+            else None
+            for sheet_name, _key, _cached, xml_bytes, subset in tasks
+        ]
+        try:
+            for (sheet_name, key, cached, xml_bytes, _subset), future in zip(tasks, futures):
+                if future is None:
+                    sheet_templates = cached
+                else:
+                    try:
+                        sheet_templates, max_index = await future
+                    except _SharedStringSubsetMiss:
+                        sheet_templates, max_index = await loop.run_in_executor(
+                            executor, _convert_sheet, sheet_name, xml_bytes, shared_strings
+                        )
+                    if cache is not None:
+                        await loop.run_in_executor(None, cache.put, key, sheet_templates, stamp(max_index))
+                for item in sheet_templates:
+                    yield item
+        finally:
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+        if cache is not None:
+            await loop.run_in_executor(None, cache.evict)
+        return
+
+    gen = iter_excel_templates(xlsx_path, cache=cache, sheets=sheets)
+    step = None
+    try:
+        while True:
+            # Shielded: cancelling the consumer must not abandon a next() that is still running
+            step = loop.run_in_executor(executor, next, gen, None)
+            item = await asyncio.shield(step)
+            step = None
+            if item is None:
+                break
+            yield item
+    finally:
+        if step is not None:
+            # The generator can only be closed once the in-flight next() has returned
+            await asyncio.wait([step])
+        await loop.run_in_executor(executor, gen.close)
+
+
+async def aconvert_excel_to_json(
+    xlsx_path: WorkbookSource,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+    executor: Optional["Executor"] = None,
+) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Async counterpart of convert_excel_to_json; see aiter_excel_templates for the executor.
+    """
+    templates: List[Dict] = []
+    counts = {"strength": 0, "emom": 0, "circuit": 0}
+    async for item in aiter_excel_templates(xlsx_path, cache=cache, sheets=sheets, executor=executor):
+        templates.append(item.template)
+        counts[item.workout_type] = counts.get(item.workout_type, 0) + 1
+    return templates, counts
+
+
+class TemplateDeduper:
+    """
+    Content-addressed dedup stage. Templates whose body (everything but id and name) was already
+    seen are dropped from the output and recorded in `aliases` as duplicate id -> id of the first
+    template with that body, so periodization blocks that repeat a DAY section every week are
+    stored once.
+    """
+
+    __slots__ = ("seen", "canonical", "aliases", "duplicate_bytes", "_body_hash")
+
+    def __init__(self) -> None:
+        from workout_template_store import template_body_hash
+
+        self.seen = 0
+        # body hash -> id of the first template with that body
+        self.canonical: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        # Compact JSON size of the dropped duplicates
+        self.duplicate_bytes = 0
+        self._body_hash = template_body_hash
+
+    def add(self, t: Dict) -> Optional[str]:
+        """
+        Returns None if `t` is the first with its body (keep it), else the id it duplicates.
+        """
+        self.seen += 1
+        first = self.canonical.setdefault(self._body_hash(t), t["id"])
+        if first == t["id"]:
+            return None
+        self.aliases[t["id"]] = first
+        self.duplicate_bytes += len(json.dumps(t, ensure_ascii=False).encode("utf-8"))
+        return first
+
+    def filter(self, templates: Iterable[Dict]) -> List[Dict]:
+        return [t for t in templates if self.add(t) is None]
+
+    @property
+    def unique(self) -> int:
+        return len(self.canonical)
+
+    def report(self) -> str:
+        ratio = self.seen / self.unique if self.unique else 1.0
+        return (
+            f"Dedup: {self.seen} templates -> {self.unique} unique bodies ({ratio:.2f}x), "
+            f"{len(self.aliases)} aliased, {self.duplicate_bytes / 1024:.1f} KB of JSON saved"
+        )
+
+
+def _aliases_path(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.stem}.aliases.json")
+
+
+def _write_aliases(out_path: Path, aliases: Dict[str, str]) -> Path:
+    """
+    Writes the duplicate id -> canonical id map next to out_path and returns its path.
+    """
+    path = _aliases_path(out_path)
+    path.write_text(json.dumps(aliases, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def _dedupe_template_ids(templates: List[Dict], taken: Optional[Set[str]] = None) -> int:
+    """
+    Makes template ids unique in place: the first template keeps its `_slugify` id and later
+    collisions get "-2", "-3", ... Pass `taken` to share the id space across several calls.
+    Returns the number of renamed templates.
+    """
+    seen: Set[str] = taken if taken is not None else set()
+    renamed = 0
+    for t in templates:
+        base = t.get("id") or _slugify(t.get("name") or "")
+        new_id = base
+        n = 1
+        while new_id in seen:
+            n += 1
+            new_id = f"{base}-{n}"
+        if new_id != t.get("id"):
+            t["id"] = new_id
+            renamed += 1
+        seen.add(new_id)
+    return renamed
+
+
+@dataclass
+class WorkbookResult:
+    # Workbook path, or the in-memory stream for uploaded workbooks (--serve)
+    path: Union[Path, IO[bytes]]
+    templates: List[Dict]
+    counts: Dict[str, int]
+    seconds: float
+    error: Optional[str] = None
+    issues: List[ValidationIssue] = field(default_factory=list)
+    # Profile events captured in a worker process, replayed by convert_workbooks
+    profile: List[ProfileEvent] = field(default_factory=list)
+
+
+def _collect_workbooks(spec: str) -> List[Path]:
+    """
+    Expands a directory (its .xlsx/.xlsm/.ods files) or a glob pattern into sorted workbook paths.
+    Excel lock files ("~$Week 1.xlsx") are skipped.
+    """
+    p = Path(spec)
+    if p.is_dir():
+        suffixes = set(workbook_suffixes())
+        candidates = [x for x in p.iterdir() if x.suffix.lower() in suffixes]
+    else:
+        candidates = [Path(x) for x in glob.glob(spec, recursive=True)]
+    return sorted(x for x in candidates if x.is_file() and not x.name.startswith("~$"))
+
+
+def _is_batch_input(spec: str) -> bool:
+    p = Path(spec)
+    if p.is_dir():
+        # A directory holding only CSV/TSV files is one exported workbook, not a batch
+        return bool(_collect_workbooks(spec)) or not any(x.suffix.lower() in CSV_SUFFIXES for x in p.iterdir())
+    return not p.exists() and any(ch in spec for ch in "*?[")
+
+
+def _convert_workbook_task(
+    xlsx_path: Path,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+    profile: bool = False,
+) -> WorkbookResult:
+    result, events = _capture_profile_events(lambda: _convert_workbook(xlsx_path, cache, sheets), profile)
+    result.profile = events
+    return result
+
+
+# What a malformed upload or file can raise while being read: a corrupt zip or XML, missing parts,
+# encrypted or unsupported zip entries (RuntimeError, NotImplementedError), truncated or undecodable
+# data and bad attribute values
+_WORKBOOK_ERRORS = (
+    zipfile.BadZipFile,
+    KeyError,
+    ET.ParseError,
+    OSError,
+    ValueError,
+    RuntimeError,
+    NotImplementedError,
+    EOFError,
+    zlib.error,
+)
+
+
+def _convert_workbook(
+    xlsx_path: Union[Path, IO[bytes]], cache: Optional[SheetCache] = None, sheets: Optional[Sequence[str]] = None, jobs: int = 1
+) -> WorkbookResult:
+    t0 = time.perf_counter()
+    templates: List[Dict] = []
+    counts = {"strength": 0, "emom": 0, "circuit": 0}
+    # Validated inside the worker as each template is produced
+    validator = TemplateValidator()
+    try:
+        for item in iter_excel_templates(xlsx_path, jobs=jobs, cache=cache, sheets=sheets):
+            tpl = _strip_nones(item.template)
+            validator.validate(tpl, len(templates), item.sheet, item.row)
+            templates.append(tpl)
+            counts[item.workout_type] = counts.get(item.workout_type, 0) + 1
+    except _WORKBOOK_ERRORS as e:
+        return WorkbookResult(xlsx_path, [], {}, time.perf_counter() - t0, f"{type(e).__name__}: {e}")
+    return WorkbookResult(xlsx_path, templates, counts, time.perf_counter() - t0, issues=validator.issues)
+
+
+def convert_workbooks(
+    paths: Sequence[Path],
+    jobs: int = 1,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+) -> List[WorkbookResult]:
+    """
+    Converts several workbooks, one task per file, and returns the results in the order given.
+    With jobs > 1 the files are spread over a process pool, so a folder costs one interpreter start.
+    """
+    if jobs > 1 and len(paths) > 1:
+        import tracemalloc
+        from concurrent.futures import ProcessPoolExecutor
+
+        n = len(paths)
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, n),
+            initializer=tracemalloc.start if tracemalloc.is_tracing() else None,
+        ) as pool:
+            results = list(pool.map(_convert_workbook_task, paths, [cache] * n, [sheets] * n, [bool(_PROFILE_HOOKS)] * n))
+        for r in results:
+            for event in r.profile:
+                _dispatch_profile_event(event)
+        return results
+    return [_convert_workbook(p, cache, sheets) for p in paths]
+
+
+def _print_batch_summary(results: Sequence[WorkbookResult]) -> None:
+    name_w = max([len("File")] + [len(r.path.name) for r in results])
+    print(f"{'File':<{name_w}}  {'Strength':>8}  {'EMOM':>5}  {'Circuit':>7}  {'Templates':>9}  {'Time (s)':>8}")
+    totals = {"strength": 0, "emom": 0, "circuit": 0}
+    total_seconds = 0.0
+    for r in results:
+        total_seconds += r.seconds
+        if r.error is not None:
+            print(f"{r.path.name:<{name_w}}  FAILED: {r.error}")
             continue
-        up = a.upper()
-        if "ALLENAMENTO PRINCIPALE" in up:
-            main_header_row = r
-            m_rounds = re.search(r"(\d+)\s*ROUND", a, flags=re.IGNORECASE)
-            if m_rounds:
-                rounds = int(m_rounds.group(1))
-            m_rest = re.search(r"(\d+)\s*sec", a, flags=re.IGNORECASE)
-            if m_rest:
-                rest_seconds = int(m_rest.group(1))
+        for k in totals:
+            totals[k] += r.counts.get(k, 0)
+        print(
+            f"{r.path.name:<{name_w}}  {r.counts.get('strength', 0):>8}  {r.counts.get('emom', 0):>5}"
+            f"  {r.counts.get('circuit', 0):>7}  {len(r.templates):>9}  {r.seconds:>8.3f}"
+        )
+    print(
+        f"Converted: {totals['strength']} strength | {totals['emom']} emom | {totals['circuit']} circuit"
+        f" from {len(results)} workbooks ({total_seconds:.3f}s of conversion)"
+    )
+
+
+class TemplateStreamWriter:
+    """
+    Writes templates one at a time, either as a JSON array or as NDJSON (one object per line).
+
+    The array form produces exactly the bytes of json.dumps(templates, ensure_ascii=False, indent=2),
+    so streamed and buffered output are interchangeable. Call close() to finish the array.
+    """
+
+    __slots__ = ("fp", "ndjson", "count")
 
-    warmup = _extract_warmup(grid, start_row, end_row)
+    def __init__(self, fp: IO[str], ndjson: bool = False) -> None:
+        self.fp = fp
+        self.ndjson = ndjson
+        self.count = 0
+
+    def write(self, template: Dict) -> None:
+        if self.ndjson:
+            self.fp.write(json.dumps(template, ensure_ascii=False))
+            self.fp.write("\n")
+        else:
+            body = json.dumps(template, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self.fp.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self.ndjson:
+            self.fp.write("[]" if self.count == 0 else "\n]")
+
+
+def _write_templates(out_path: Path, templates: List[Dict], ndjson: bool = False) -> None:
+    span = _profile_start()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as fp:
+        writer = TemplateStreamWriter(fp, ndjson=ndjson)
+        for t in templates:
+            writer.write(t)
+        writer.close()
+    _profile_emit(span, "write_output", str(out_path), rows=len(templates))
+
+
+def _write_workbook(
+    xlsx_path: Path,
+    out_path: Path,
+    ndjson: bool = False,
+    stream: bool = False,
+    jobs: int = 1,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+    deduper: Optional[TemplateDeduper] = None,
+) -> Tuple[TemplateValidator, Dict[str, int], int]:
+    """
+    Converts one workbook, validating every template as it is produced, and writes the output.
+    Returns the validator, the per-type counts and the number of templates written.
+
+    With stream=True each template is written as soon as it is extracted, so only one template
+    is held at a time; otherwise the list is written once complete. Either way the output goes
+    to a temporary file that replaces out_path only if every template validates. After the first
+    invalid template nothing more is written, but conversion continues so the validator reports
+    every issue in the workbook. With a deduper, templates whose body was already written are
+    left out (see TemplateDeduper).
+    """
+    counts = {"strength": 0, "emom": 0, "circuit": 0}
+    validator = TemplateValidator()
+    seen_ids: Set[str] = set()
+    buffered: List[Dict] = []
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f"{out_path.name}.partial")
+    # Writes are interleaved with extraction when streaming, so their time is summed separately
+    profiling = bool(_PROFILE_HOOKS)
+    write_seconds = 0.0
+    try:
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            writer = TemplateStreamWriter(fp, ndjson=ndjson)
+            for item in iter_excel_templates(xlsx_path, jobs=jobs, cache=cache, sheets=sheets):
+                tpl = _strip_nones(item.template)
+                _dedupe_template_ids([tpl], seen_ids)
+                counts[item.workout_type] = counts.get(item.workout_type, 0) + 1
+                if not validator.validate(tpl, sheet=item.sheet, row=item.row) or not validator.ok:
+                    continue
+                if deduper is not None and deduper.add(tpl) is not None:
+                    continue
+                if stream:
+                    t0 = time.perf_counter() if profiling else 0.0
+                    writer.write(tpl)
+                    if profiling:
+                        write_seconds += time.perf_counter() - t0
+                else:
+                    buffered.append(tpl)
+            span = _profile_start()
+            for tpl in buffered:
+                writer.write(tpl)
+            writer.close()
+            if span is not None:
+                write_seconds += time.perf_counter() - span[0]
+            _profile_emit(span, "write_output", str(out_path), rows=writer.count, seconds=write_seconds)
+        if validator.ok:
+            os.replace(tmp_path, out_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return validator, counts, writer.count
+
+
+def _print_issues(issues: Sequence[ValidationIssue], source: Optional[str] = None, limit: int = 20) -> None:
+    where = f" in {source}" if source else ""
+    print(f"Validation error{where}: {len(issues)} problem(s)")
+    for issue in issues[:limit]:
+        print(f"  {issue}")
+    if len(issues) > limit:
+        print(f"  ... and {len(issues) - limit} more")
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    paths = _collect_workbooks(args.workbook)
+    if not paths:
+        print(f"Error: no .xlsx workbooks match: {args.workbook}")
+        return 2
 
-    stations: List[Dict] = []
-    scan_start = (main_header_row or start_row)
-    for r in grid.iter_rows(scan_start, end_row):
-        a = grid.col_a(r)
-        b = grid.col_b(r)
-        if not a or not b:
+    results = convert_workbooks(paths, jobs=args.jobs, cache=_cache_from_args(args), sheets=_sheets_from_args(args))
+    _print_batch_summary(results)
+    ok = [r for r in results if r.error is None]
+    status = 0 if len(ok) == len(results) else 1
+    # Merged and database output share one deduper, so sections repeated across workbooks are stored once
+    deduper = TemplateDeduper() if args.dedupe else None
+
+    if _exports_to_database(args):
+        invalid = [r for r in ok if r.issues]
+        for r in invalid:
+            _print_issues(r.issues, r.path.name)
+        if invalid:
+            return 1
+        merged = [t for r in ok for t in r.templates]
+        renamed = _dedupe_template_ids(merged)
+        if renamed:
+            print(f"Renamed {renamed} duplicate ids")
+        checked = len(merged)
+        if deduper is not None:
+            merged = deduper.filter(merged)
+            print(deduper.report())
+        _export_templates(args, merged, checked, deduper.aliases if deduper is not None else None)
+        return status
+
+    if args.merge:
+        if args.output:
+            out_path = Path(args.output)
+        elif Path(args.workbook).is_dir():
+            out_path = Path(args.workbook) / "templates.json"
+        else:
+            out_path = Path("templates.json")
+        invalid = [r for r in ok if r.issues]
+        for r in invalid:
+            _print_issues(r.issues, r.path.name)
+        if invalid:
+            return 1
+        merged = [t for r in ok for t in r.templates]
+        renamed = _dedupe_template_ids(merged)
+        checked = len(merged)
+        if deduper is not None:
+            merged = deduper.filter(merged)
+        _write_templates(out_path, merged, ndjson=args.ndjson)
+        print(f"Wrote: {out_path} ({renamed} duplicate ids renamed)")
+        if deduper is not None:
+            print(f"Wrote: {_write_aliases(out_path, deduper.aliases)}")
+            print(deduper.report())
+        print(f"Admin import validation: OK ({checked} templates checked, {len(merged)} written)")
+        return status
+
+    out_dir = Path(args.output) if args.output else None
+    suffix = ".ndjson" if args.ndjson else ".json"
+    for r in ok:
+        if r.issues:
+            _print_issues(r.issues, r.path.name)
+            status = 1
             continue
-        m = re.match(r"^\s*(\d+)\.\s*(.+)$", a)
-        if not m:
+        _dedupe_template_ids(r.templates)
+        out_path = (out_dir / r.path.name).with_suffix(suffix) if out_dir else r.path.with_suffix(suffix)
+        if not args.dedupe:
+            _write_templates(out_path, r.templates, ndjson=args.ndjson)
+            print(f"Wrote: {out_path} ({len(r.templates)} templates)")
             continue
-        order = int(m.group(1))
-        label = m.group(2).strip()
-        stations.append({"order": order, "label": label, "target": b})
-
-    return {
-        "id": _slugify(workout_name),
-        "name": workout_name,
-        "type": "circuit",
-        "exercises": [],
-        "rounds": rounds or 1,
-        "restBetweenRoundsSeconds": rest_seconds,
-        "warmup": warmup or None,
-        "stations": stations,
-    }
+        # Ids are only unique within each output file here, so each workbook is deduped on its own
+        deduper = TemplateDeduper()
+        templates = deduper.filter(r.templates)
+        _write_templates(out_path, templates, ndjson=args.ndjson)
+        _write_aliases(out_path, deduper.aliases)
+        print(f"Wrote: {out_path} ({len(templates)} templates, {len(deduper.aliases)} aliases)")
+        print(f"  {deduper.report()}")
+    return status
 
 
-def convert_excel_to_json(xlsx_path: Path) -> Tuple[List[Dict], Dict[str, int]]:
-    templates: List[Dict] = []
-    counts = {"strength": 0, "emom": 0, "circuit": 0}
+def _exports_to_database(args: argparse.Namespace) -> bool:
+    return bool(args.sqlite or args.pg_copy)
+
+
+def _export_templates(
+    args: argparse.Namespace, templates: List[Dict], checked: int, aliases: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Writes validated templates to the --sqlite and/or --pg-copy backends. `checked` is the number
+    of templates validated, which --dedupe makes larger than len(templates). With --dedupe, aliases
+    (duplicate id -> stored id) go to the `template_aliases` table of either backend.
+    """
+    from workout_template_store import SqliteTemplateStore, write_postgres_copy
+
+    if args.sqlite:
+        with SqliteTemplateStore(args.sqlite) as store:
+            result = store.upsert(
+                templates, changed_only=args.changed_only, created_by=args.created_by, aliases=aliases
+            )
+            total = store.count()
+        print(f"Stored: {result} in {args.sqlite} ({total} templates in store)")
+    if args.pg_copy:
+        out_path = Path(args.pg_copy)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", encoding="utf-8") as fp:
+            n = write_postgres_copy(
+                fp, templates, changed_only=args.changed_only, created_by=args.created_by, aliases=aliases
+            )
+        print(f"Wrote: {out_path} (COPY of {n} templates, {len(aliases or ())} aliases; load with psql -f)")
+    print(f"Admin import validation: OK ({checked} templates checked, {len(templates)} written)")
+
+
+class TemplateDiff(NamedTuple):
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+
+
+def _diff_template_hashes(old: Dict[str, str], new: Dict[str, str]) -> TemplateDiff:
+    return TemplateDiff(
+        added=[tid for tid in new if tid not in old],
+        changed=[tid for tid, h in new.items() if tid in old and old[tid] != h],
+        removed=[tid for tid in old if tid not in new],
+    )
 
-    for sheet_name, sheet_xml in _load_workbook_sheets(xlsx_path):
-        grid = _parse_xlsx_sheet_xml(sheet_name, sheet_xml)
 
-        # Find all workout section start rows (day headers) in column A
-        starts: List[Tuple[int, int, str]] = []
-        for r in range(1, grid.max_row + 1):
-            a = grid.col_a(r)
-            if not a:
+class WorkbookWatcher:
+    """
+    Polls a directory / glob of workbooks and reconverts the ones that change.
+
+    A workbook is picked up once its (mtime, size) has been stable for `debounce` seconds, so a
+    burst of saves is converted once. Sheets are served from a MemorySheetCache keyed by their zip
+    entry CRC32/size and checked against the part of the shared strings they read, so only the
+    sheets that actually changed inside the workbook are parsed.
+    Each conversion reports the template ids added, changed and removed since the last good run.
+    """
+
+    def __init__(
+        self,
+        spec: str,
+        on_converted: Callable[[WorkbookResult], None],
+        cache: Optional[MemorySheetCache] = None,
+        sheets: Optional[Sequence[str]] = None,
+        interval: float = 1.0,
+        debounce: float = 0.5,
+        jobs: int = 1,
+    ) -> None:
+        self.spec = spec
+        self.on_converted = on_converted
+        self.cache = cache if cache is not None else MemorySheetCache()
+        self.sheets = sheets
+        self.interval = interval
+        self.debounce = debounce
+        self.jobs = jobs
+        # path -> (mtime_ns, size) of the last conversion attempt
+        self._converted: Dict[Path, Tuple[int, int]] = {}
+        # path -> (signature, time it was first seen) while waiting for saves to settle
+        self._settling: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        # path -> {template id: content hash} of the last successful conversion
+        self._hashes: Dict[Path, Dict[str, str]] = {}
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        found: Dict[Path, Tuple[int, int]] = {}
+        for path in _collect_workbooks(self.spec):
+            try:
+                st = path.stat()
+            except OSError:
                 continue
-            parsed = _looks_like_day_header(a)
-            if not parsed:
+            found[path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def poll(self, now: Optional[float] = None) -> int:
+        """
+        Runs one scan, converting workbooks whose changes have settled. Returns the number converted.
+        """
+        now = time.monotonic() if now is None else now
+        found = self._scan()
+        for path in [p for p in self._converted if p not in found]:
+            del self._converted[path]
+            self._settling.pop(path, None)
+            removed = sorted(self._hashes.pop(path, {}))
+            _print_watch_event(path, TemplateDiff([], [], removed), "removed")
+
+        converted = 0
+        for path, sig in found.items():
+            if self._converted.get(path) == sig:
+                self._settling.pop(path, None)
                 continue
-            day_num, normalized_header = parsed
-            workout_name = f"{sheet_name} - {normalized_header}"
-            starts.append((r, day_num, workout_name))
-
-        # Determine section boundaries and extract each workout
-        for idx, (start_row, _day_num, workout_name) in enumerate(starts):
-            end_row = (starts[idx + 1][0] - 1) if idx + 1 < len(starts) else grid.max_row
-            wtype = _section_type_from_name(workout_name)
-
-            if wtype == "strength":
-                tpl = extract_strength_workout(grid, start_row, end_row, workout_name)
-            elif wtype == "emom":
-                tpl = extract_emom_workout(grid, start_row, end_row, workout_name)
-            elif wtype == "circuit":
-                tpl = extract_circuit_workout(grid, start_row, end_row, workout_name)
-            else:
-                tpl = extract_strength_workout(grid, start_row, end_row, workout_name)
+            settling = self._settling.get(path)
+            if settling is None or settling[0] != sig:
+                self._settling[path] = (sig, now)
+                if self.debounce > 0:
+                    continue
+            elif now - settling[1] < self.debounce:
+                continue
+            del self._settling[path]
+            self._converted[path] = sig
+            self._convert(path)
+            converted += 1
+        return converted
+
+    def _convert(self, path: Path) -> None:
+        from workout_template_store import template_content_hash
+
+        misses = self.cache.misses
+        lookups = self.cache.hits + self.cache.misses
+        result = _convert_workbook(path, self.cache, self.sheets, self.jobs)
+        sheets_seen = self.cache.hits + self.cache.misses - lookups
+        note = f"{self.cache.misses - misses} of {sheets_seen} sheets reconverted, {result.seconds:.3f}s"
+        if result.error is not None:
+            print(f"{path.name}: FAILED: {result.error}")
+            return
+        if result.issues:
+            _print_issues(result.issues, path.name)
+            return
+        _dedupe_template_ids(result.templates)
+        self.on_converted(result)
+        new_hashes = {t["id"]: template_content_hash(t) for t in result.templates}
+        diff = _diff_template_hashes(self._hashes.get(path, {}), new_hashes)
+        self._hashes[path] = new_hashes
+        _print_watch_event(path, diff, note)
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            self.poll()
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(self.interval)
+
+
+def _print_watch_event(path: Path, diff: TemplateDiff, note: str, limit: int = 20) -> None:
+    stamp = time.strftime("%H:%M:%S")
+    print(
+        f"[{stamp}] {path.name}: +{len(diff.added)} added | ~{len(diff.changed)} changed"
+        f" | -{len(diff.removed)} removed ({note})"
+    )
+    for mark, ids in (("+", diff.added), ("~", diff.changed), ("-", diff.removed)):
+        for tid in ids[:limit]:
+            print(f"  {mark} {tid}")
+        if len(ids) > limit:
+            print(f"  {mark} ... and {len(ids) - limit} more")
+    sys.stdout.flush()
 
-            templates.append(tpl)
-            counts[wtype] = counts.get(wtype, 0) + 1
 
-    return templates, counts
+def _run_watch(args: argparse.Namespace) -> int:
+    out_dir = Path(args.output) if args.output else None
+    suffix = ".ndjson" if args.ndjson else ".json"
+
+    def write(result: WorkbookResult) -> None:
+        if _exports_to_database(args):
+            _export_templates(args, result.templates, len(result.templates))
+        else:
+            out_path = (out_dir / result.path.name).with_suffix(suffix) if out_dir else result.path.with_suffix(suffix)
+            _write_templates(out_path, result.templates, ndjson=args.ndjson)
+
+    disk_cache = _cache_from_args(args)
+    watcher = WorkbookWatcher(
+        args.workbook,
+        write,
+        cache=MemorySheetCache(disk_cache),
+        sheets=_sheets_from_args(args),
+        interval=max(args.poll, 0.05),
+        debounce=max(args.debounce, 0.0),
+        jobs=args.jobs,
+    )
+    print(f"Watching {args.workbook} (poll {watcher.interval:g}s, debounce {watcher.debounce:g}s); Ctrl+C to stop")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
 
 
-def main(argv: List[str]) -> int:
-    if len(argv) < 2:
-        print("Usage: python convert_workout_excel_to_json.py <workbook.xlsx> [output.json]")
+DEFAULT_SERVE_ADDRESS = "127.0.0.1:8765"
+SERVE_MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+
+def _convert_upload_task(
+    data: bytes,
+    cache: Optional[SheetCache] = None,
+    sheets: Optional[Sequence[str]] = None,
+    ndjson: bool = False,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Converts uploaded workbook bytes into an HTTP response (status, headers, body).
+
+    Runs in a --serve worker process; the body is encoded there so only bytes cross the pool. Any
+    other failure becomes a 500 so the client always gets a response.
+    """
+    try:
+        return _convert_upload_response(data, cache, sheets, ndjson)
+    except Exception as e:
+        return 500, {"Content-Type": "application/json"}, _json_bytes({"error": f"{type(e).__name__}: {e}"})
+
+
+def _convert_upload_response(
+    data: bytes, cache: Optional[SheetCache], sheets: Optional[Sequence[str]], ndjson: bool
+) -> Tuple[int, Dict[str, str], bytes]:
+    result = _convert_workbook(io.BytesIO(data), cache, sheets)
+    if result.error is not None:
+        return 400, {"Content-Type": "application/json"}, _json_bytes({"error": result.error})
+    if result.issues:
+        issues = [str(issue) for issue in result.issues]
+        return 422, {"Content-Type": "application/json"}, _json_bytes({"error": "validation failed", "issues": issues})
+    _dedupe_template_ids(result.templates)
+    out = io.StringIO()
+    writer = TemplateStreamWriter(out, ndjson=ndjson)
+    for t in result.templates:
+        writer.write(t)
+    writer.close()
+    headers = {
+        "Content-Type": "application/x-ndjson" if ndjson else "application/json",
+        "X-Converted": (
+            f"{result.counts.get('strength', 0)} strength | {result.counts.get('emom', 0)} emom"
+            f" | {result.counts.get('circuit', 0)} circuit"
+        ),
+    }
+    return 200, headers, out.getvalue().encode("utf-8")
+
+
+def _json_bytes(obj: object) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _warm_serve_worker() -> None:
+    # Runs once per worker at pool start so the first request doesn't pay for the fork
+    return None
+
+
+class ConverterService:
+    """
+    State kept warm by the --serve daemon: the worker pool, the sheet cache and request counters.
+
+    With jobs > 1 conversions run in a process pool started up front; otherwise they run in the
+    request thread.
+    """
+
+    def __init__(self, jobs: int = 1, cache: Optional[SheetCache] = None) -> None:
+        self.jobs = jobs
+        self.cache = cache
+        self.requests = 0
+        self.started = time.monotonic()
+        self._pool = None
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor, wait
+
+            self._pool = ProcessPoolExecutor(max_workers=jobs)
+            wait([self._pool.submit(_warm_serve_worker) for _ in range(jobs)])
+
+    def convert(
+        self, data: bytes, sheets: Optional[Sequence[str]] = None, ndjson: bool = False
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        self.requests += 1
+        if self._pool is None:
+            return _convert_upload_task(data, self.cache, sheets, ndjson)
+        return self._pool.submit(_convert_upload_task, data, self.cache, sheets, ndjson).result()
+
+    def health(self) -> Dict[str, object]:
+        return {"ok": True, "jobs": self.jobs, "requests": self.requests, "uptime": time.monotonic() - self.started}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _make_converter_server(address: str, service: ConverterService):
+    """
+    HTTP server for `address`: "HOST:PORT" (or just PORT) for TCP, or a filesystem path for a
+    Unix socket. Each connection is handled in its own thread.
+
+      POST /convert[?sheets=A,B&ndjson=1]  body: workbook bytes -> template JSON (422 + issues if invalid)
+      GET  /health                         -> {"ok": true, "requests": ..., "uptime": ...}
+    """
+    import socketserver
+    import stat
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str) -> None:
+            self._reply(status, {"Content-Type": "application/json"}, _json_bytes({"error": message}))
+
+        def do_GET(self) -> None:
+            if urlsplit(self.path).path != "/health":
+                self._error(404, "not found")
+                return
+            self._reply(200, {"Content-Type": "application/json"}, _json_bytes(service.health()))
+
+        def do_POST(self) -> None:
+            url = urlsplit(self.path)
+            if url.path != "/convert":
+                self._error(404, "not found")
+                return
+            try:
+                length = int(self.headers.get("Content-Length", ""))
+            except ValueError:
+                self._error(411, "Content-Length required")
+                return
+            if length < 0:
+                self._error(400, "invalid Content-Length")
+                self.close_connection = True
+                return
+            if length > SERVE_MAX_UPLOAD_BYTES:
+                self._error(413, f"workbook larger than {SERVE_MAX_UPLOAD_BYTES} bytes")
+                self.close_connection = True
+                return
+            data = self.rfile.read(length)
+            query = parse_qs(url.query)
+            sheets = [n.strip() for v in query.get("sheets", []) for n in v.split(",") if n.strip()] or None
+            ndjson = query.get("ndjson", ["0"])[-1] not in ("", "0", "false")
+            try:
+                reply = service.convert(data, sheets, ndjson)
+            except Exception as e:
+                # e.g. a worker process died; the task itself already maps conversion errors
+                self._error(500, f"{type(e).__name__}: {e}")
+                return
+            self._reply(*reply)
+
+        def address_string(self) -> str:
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    if "/" in address or address.endswith(".sock"):
+
+        class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        # Replace a stale socket from an earlier run, but never any other file
+        if os.path.lexists(address):
+            if not stat.S_ISSOCK(os.lstat(address).st_mode):
+                raise FileExistsError(f"{address} exists and is not a socket")
+            os.remove(address)
+        return UnixServer(address, Handler)
+
+    host, _, port = address.rpartition(":")
+    return ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    service = ConverterService(jobs=args.jobs, cache=_cache_from_args(args))
+    try:
+        server = _make_converter_server(args.serve, service)
+    except (OSError, ValueError) as e:
+        service.close()
+        print(f"Error: cannot listen on {args.serve}: {e}")
         return 2
+    print(f"Serving on {args.serve} ({args.jobs} worker{'s' if args.jobs > 1 else ''}); Ctrl+C to stop")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
 
-    xlsx_path = Path(argv[1])
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python convert_workout_excel_to_json.py",
+        description="Convert a coach workbook into template JSON for the Admin importer.",
+    )
+    parser.add_argument(
+        "workbook",
+        nargs="?",
+        help=(
+            "workbook to convert (.xlsx, .xlsm, .ods, or a .csv/.tsv file or directory of them, one sheet per "
+            "file), or a directory / glob pattern to convert every workbook it matches"
+        ),
+    )
+    parser.add_argument(
+        "output",
+        nargs="?",
+        help=(
+            "output.json (default: next to the workbook); in batch mode the output directory, "
+            "or the merged file with --merge"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="worker processes: sheets of one workbook, or whole workbooks in batch mode (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="batch mode: write every template into one file (default: templates.json) with unique ids",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="write each template as soon as it is extracted and validated instead of buffering the whole list",
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="write newline-delimited JSON (one template per line); streamed for a single workbook",
+    )
+    parser.add_argument(
+        "--sheets",
+        metavar="NAMES",
+        help='comma-separated sheet names to convert, e.g. "Week 1,Week 2" (default: all sheets)',
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="convert every sheet instead of reusing results for unchanged sheets",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"sheet cache directory (default: {_default_cache_dir()})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="evict least recently used sheets beyond this size (default: %(default)s MB)",
+    )
+    parser.add_argument(
+        "--sqlite",
+        metavar="DB",
+        help="upsert the templates into a SQLite templates table (Supabase row shape) instead of writing JSON",
+    )
+    parser.add_argument(
+        "--pg-copy",
+        metavar="FILE.sql",
+        help="write a psql script that COPYs the templates into Postgres and upserts them on id",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="with --sqlite/--pg-copy: leave templates whose content is unchanged untouched",
+    )
+    parser.add_argument(
+        "--created-by",
+        metavar="USER_ID",
+        help="created_by value for --sqlite/--pg-copy rows (default: NULL, existing values are kept)",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help=(
+            "store templates with identical content (ignoring id and name) once; duplicates are written to "
+            "OUTPUT.aliases.json (or the template_aliases table with --sqlite/--pg-copy) as duplicate id -> stored id"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "keep running and reconvert workbooks matching WORKBOOK (a directory, glob or file) whenever they "
+            "change; only changed sheets are re-parsed and added/changed/removed template ids are reported"
+        ),
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="--watch: how often to check workbook mtimes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="--watch: wait until a workbook has been unchanged this long before converting (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const=DEFAULT_SERVE_ADDRESS,
+        metavar="ADDRESS",
+        help=(
+            "run as a local daemon that converts workbooks POSTed to /convert, keeping the converter warm; "
+            f"ADDRESS is HOST:PORT or a Unix socket path (default: {DEFAULT_SERVE_ADDRESS}); --jobs sets the pool size"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="TRACE.json",
+        help=(
+            "print time, rows, cells and allocations per stage, plus the slowest sheets and sections; "
+            "optionally write every event to TRACE.json"
+        ),
+    )
+    return parser
+
+
+def _sheets_from_args(args: argparse.Namespace) -> Optional[List[str]]:
+    if not args.sheets:
+        return None
+    return [name.strip() for name in args.sheets.split(",") if name.strip()]
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[SheetCache]:
+    if args.no_cache:
+        return None
+    directory = Path(args.cache_dir) if args.cache_dir else None
+    return SheetCache(directory, max_bytes=max(args.cache_size, 0) * 1024 * 1024)
+
+
+# Normalize None fields away to keep JSON clean (Admin importer accepts missing optional fields)
+def _strip_nones(obj):
+    if isinstance(obj, list):
+        return [_strip_nones(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _strip_nones(v) for k, v in obj.items() if v is not None}
+    return obj
+
+
+def main(argv: List[str]) -> int:
+    parser = _build_arg_parser()
+    args = parser.parse_intermixed_args(argv[1:])
+    if args.workbook is None and args.serve is None:
+        parser.error("the following arguments are required: workbook")
+    if args.profile is None:
+        return _run(args)
+
+    with Profiler(track_memory=True) as profiler:
+        status = _run(args)
+    print(profiler.summary())
+    if args.profile:
+        Path(args.profile).write_text(json.dumps(profiler.to_json(), indent=2), encoding="utf-8")
+        print(f"Wrote profile: {args.profile}")
+    return status
+
+
+def _run(args: argparse.Namespace) -> int:
+    if args.jobs < 1:
+        print("Error: --jobs must be >= 1")
+        return 2
+    if args.serve is not None:
+        return _run_serve(args)
+    if args.watch:
+        return _run_watch(args)
+    if _is_batch_input(args.workbook):
+        return _run_batch(args)
+
+    xlsx_path = Path(args.workbook)
     if not xlsx_path.exists():
         print(f"Error: file not found: {xlsx_path}")
         return 2
 
-    out_path = Path(argv[2]) if len(argv) >= 3 else xlsx_path.with_suffix(".json")
-
-    templates, counts = convert_excel_to_json(xlsx_path)
+    if _exports_to_database(args):
+        result = _convert_workbook(xlsx_path, _cache_from_args(args), _sheets_from_args(args), args.jobs)
+        if result.error is not None:
+            print(f"Error: {result.error}")
+            return 2
+        if result.issues:
+            _print_issues(result.issues)
+            return 1
+        _dedupe_template_ids(result.templates)
+        print(
+            f"Converted: {result.counts.get('strength', 0)} strength | {result.counts.get('emom', 0)} emom"
+            f" | {result.counts.get('circuit', 0)} circuit"
+        )
+        if args.dedupe:
+            deduper = TemplateDeduper()
+            templates = deduper.filter(result.templates)
+            print(deduper.report())
+            _export_templates(args, templates, len(result.templates), deduper.aliases)
+        else:
+            _export_templates(args, result.templates, len(result.templates))
+        return 0
 
-    # Normalize None fields away to keep JSON clean (Admin importer accepts missing optional fields)
-    def strip_nones(obj):
-        if isinstance(obj, list):
-            return [strip_nones(x) for x in obj]
-        if isinstance(obj, dict):
-            return {k: strip_nones(v) for k, v in obj.items() if v is not None}
-        return obj
+    out_path = Path(args.output) if args.output else xlsx_path.with_suffix(".ndjson" if args.ndjson else ".json")
+    deduper = TemplateDeduper() if args.dedupe else None
 
-    templates = strip_nones(templates)
+    try:
+        validator, counts, written = _write_workbook(
+            xlsx_path,
+            out_path,
+            ndjson=args.ndjson,
+            stream=args.stream or args.ndjson,
+            jobs=args.jobs,
+            cache=_cache_from_args(args),
+            sheets=_sheets_from_args(args),
+            deduper=deduper,
+        )
+    except KeyError as e:
+        print(f"Error: {e.args[0] if e.args else e}")
+        return 2
 
-    # Validate output matches Admin importer expectations (mirrors `importTemplatesFromJSON` rules)
-    def fail(msg: str) -> int:
-        print(f"Validation error: {msg}")
+    # Output is only written when it matches Admin importer expectations
+    if not validator.ok:
+        _print_issues(validator.issues)
         return 1
 
-    def is_non_empty_string(v) -> bool:
-        return isinstance(v, str) and v.strip() != ""
-
-    def validate_targeted(items, label: str, required: bool, require_non_empty: bool):
-        if items is None:
-            return [] if not required else None
-        if not isinstance(items, list):
-            return None
-        if require_non_empty and len(items) == 0:
-            return None
-        for idx, it in enumerate(items):
-            if not isinstance(it, dict):
-                return None
-            if not is_non_empty_string(it.get("label")):
-                return None
-            if not is_non_empty_string(it.get("target")):
-                return None
-        return items
-
-    for i, t in enumerate(templates):
-        if not isinstance(t, dict):
-            return fail(f"Template {i + 1}: must be an object")
-        if not is_non_empty_string(t.get("name")):
-            return fail(f'Template {i + 1}: Missing or invalid "name" field')
-        raw_type = t.get("type", "strength")
-        if raw_type not in ("strength", "emom", "circuit"):
-            return fail(f'Template {i + 1}: Invalid "type"')
-        if raw_type == "strength":
-            exs = t.get("exercises")
-            if not isinstance(exs, list) or len(exs) == 0:
-                return fail(f'Template {i + 1}: Missing or empty "exercises" array')
-            for j, ex in enumerate(exs):
-                if not isinstance(ex, dict):
-                    return fail(f"Template {i + 1}, Exercise {j + 1}: must be an object")
-                if not is_non_empty_string(ex.get("name")):
-                    return fail(f'Template {i + 1}, Exercise {j + 1}: Missing or invalid "name"')
-                if not isinstance(ex.get("sets"), int) or ex["sets"] < 1:
-                    return fail(f'Template {i + 1}, Exercise {j + 1}: "sets" must be an int >= 1')
-                if not isinstance(ex.get("reps"), int) or ex["reps"] < 1:
-                    return fail(f'Template {i + 1}, Exercise {j + 1}: "reps" must be an int >= 1')
-                if "weight" in ex and (not isinstance(ex["weight"], (int, float)) or ex["weight"] < 0):
-                    return fail(f'Template {i + 1}, Exercise {j + 1}: "weight" must be a number >= 0')
-        elif raw_type == "emom":
-            if not isinstance(t.get("durationMinutes"), (int, float)) or t["durationMinutes"] <= 0:
-                return fail(f'Template {i + 1}: "durationMinutes" must be a number > 0')
-            if validate_targeted(t.get("warmup"), "warmup", required=False, require_non_empty=False) is None:
-                return fail(f'Template {i + 1}: Invalid "warmup"')
-            if validate_targeted(t.get("minuteA"), "minuteA", required=True, require_non_empty=True) is None:
-                return fail(f'Template {i + 1}: Invalid or empty "minuteA"')
-            if validate_targeted(t.get("minuteB"), "minuteB", required=True, require_non_empty=True) is None:
-                return fail(f'Template {i + 1}: Invalid or empty "minuteB"')
-            if validate_targeted(t.get("extras"), "extras", required=False, require_non_empty=False) is None:
-                return fail(f'Template {i + 1}: Invalid "extras"')
-            if not isinstance(t.get("exercises"), list):
-                return fail(f'Template {i + 1}: "exercises" must be an array (can be empty)')
-        elif raw_type == "circuit":
-            if not isinstance(t.get("rounds"), int) or t["rounds"] < 1:
-                return fail(f'Template {i + 1}: "rounds" must be an int >= 1')
-            if "restBetweenRoundsSeconds" in t and t["restBetweenRoundsSeconds"] is not None:
-                if not isinstance(t["restBetweenRoundsSeconds"], int) or t["restBetweenRoundsSeconds"] < 0:
-                    return fail(f'Template {i + 1}: "restBetweenRoundsSeconds" must be an int >= 0')
-            if validate_targeted(t.get("warmup"), "warmup", required=False, require_non_empty=False) is None:
-                return fail(f'Template {i + 1}: Invalid "warmup"')
-            sts = t.get("stations")
-            if not isinstance(sts, list) or len(sts) == 0:
-                return fail(f'Template {i + 1}: Missing or empty "stations" array')
-            for j, st in enumerate(sts):
-                if not isinstance(st, dict):
-                    return fail(f"Template {i + 1}, Station {j + 1}: must be an object")
-                if not isinstance(st.get("order"), int) or st["order"] < 1:
-                    return fail(f'Template {i + 1}, Station {j + 1}: "order" must be an int >= 1')
-                if not is_non_empty_string(st.get("label")):
-                    return fail(f'Template {i + 1}, Station {j + 1}: Missing or invalid "label"')
-                if not is_non_empty_string(st.get("target")):
-                    return fail(f'Template {i + 1}, Station {j + 1}: Missing or invalid "target"')
-            if not isinstance(t.get("exercises"), list):
-                return fail(f'Template {i + 1}: "exercises" must be an array (can be empty)')
-
-    out_path.write_text(json.dumps(templates, ensure_ascii=False, indent=2), encoding="utf-8")
-
     print(
         f"Converted: {counts.get('strength', 0)} strength | {counts.get('emom', 0)} emom | {counts.get('circuit', 0)} circuit"
     )
     print(f"Wrote: {out_path}")
-    print(f"Admin import validation: OK ({len(templates)} templates)")
+    if deduper is not None:
+        print(f"Wrote: {_write_aliases(out_path, deduper.aliases)}")
+        print(deduper.report())
+    print(f"Admin import validation: OK ({validator.checked} templates checked, {written} written)")
     return 0
 
 
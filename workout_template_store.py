@@ -0,0 +1,248 @@
+"""
+Database backends for converted workout templates.
+
+Rows have the shape `upsertTemplatesToSupabase` (src/services/workoutService.ts) sends to the
+Supabase `templates` table: id, name, type, data (the whole template) and created_by. Each row
+also carries a content hash, so a re-import of a big workbook can skip the templates that did
+not change. Deduplicated imports also record which ids are aliases of a stored body.
+"""
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+# SQLite limits bound parameters per statement (999 on older builds)
+_LOOKUP_CHUNK = 500
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL DEFAULT 'strength',
+    data TEXT NOT NULL,
+    created_by TEXT,
+    content_hash TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_SQLITE_ALIAS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS template_aliases (
+    id TEXT PRIMARY KEY,
+    template_id TEXT NOT NULL
+)
+"""
+
+_SQLITE_ALIAS_UPSERT = """
+INSERT INTO template_aliases (id, template_id) VALUES (?, ?)
+ON CONFLICT(id) DO UPDATE SET template_id = excluded.template_id
+"""
+
+_PG_ALIAS_SCHEMA = "CREATE TABLE IF NOT EXISTS template_aliases (id text PRIMARY KEY, template_id text NOT NULL);\n"
+
+# Identity fields left out of the body hash: copies of a section differ only in these
+_BODY_IGNORED_FIELDS = ("id", "name")
+
+_SQLITE_UPSERT = """
+INSERT INTO templates (id, name, type, data, created_by, content_hash)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name,
+    type = excluded.type,
+    data = excluded.data,
+    created_by = COALESCE(excluded.created_by, templates.created_by),
+    content_hash = excluded.content_hash,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+
+@dataclass
+class StoreResult:
+    __slots__ = ("inserted", "updated", "unchanged", "aliased")
+
+    inserted: int
+    updated: int
+    # Rows skipped because their content hash matched (changed-only mode)
+    unchanged: int
+    # Alias rows written (deduplicated imports)
+    aliased: int
+
+    def __str__(self) -> str:
+        text = f"{self.inserted} inserted | {self.updated} updated | {self.unchanged} unchanged"
+        return f"{text} | {self.aliased} aliased" if self.aliased else text
+
+
+def template_content_hash(t: Dict[str, Any]) -> str:
+    """
+    sha256 of the template's canonical JSON (sorted keys, no whitespace), so key order in the
+    converter output does not count as a change.
+    """
+    canonical = json.dumps(t, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def template_body_hash(t: Dict[str, Any]) -> str:
+    """
+    sha256 of the template's canonical JSON without its id and name: the same DAY section copied
+    into every week of a program hashes the same.
+    """
+    body = {k: v for k, v in t.items() if k not in _BODY_IGNORED_FIELDS}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def template_row(t: Dict[str, Any], created_by: Optional[str] = None) -> Tuple[str, str, str, str, Optional[str], str]:
+    """
+    (id, name, type, data, created_by, content_hash) for one template; data is the JSON text.
+    """
+    return (
+        t["id"],
+        t["name"],
+        t.get("type") or "strength",
+        json.dumps(t, ensure_ascii=False),
+        created_by,
+        template_content_hash(t),
+    )
+
+
+class SqliteTemplateStore:
+    """
+    Local SQLite copy of the Supabase `templates` table.
+
+    upsert() writes a whole batch, templates and aliases, with executemany in a single
+    transaction, so an import either lands completely or not at all.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        with self._conn:
+            self._conn.execute(_SQLITE_SCHEMA)
+            self._conn.execute(_SQLITE_ALIAS_SCHEMA)
+
+    def __enter__(self) -> "SqliteTemplateStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _existing_hashes(self, ids: Sequence[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        for i in range(0, len(ids), _LOOKUP_CHUNK):
+            chunk = ids[i : i + _LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            found.update(self._conn.execute(f"SELECT id, content_hash FROM templates WHERE id IN ({marks})", chunk))
+        return found
+
+    def upsert(
+        self,
+        templates: Iterable[Dict[str, Any]],
+        changed_only: bool = False,
+        created_by: Optional[str] = None,
+        aliases: Optional[Dict[str, str]] = None,
+    ) -> StoreResult:
+        """
+        Inserts new templates and replaces existing ones by id. With changed_only=True, rows whose
+        content hash matches the stored one are left untouched (updated_at included).
+
+        `aliases` (duplicate id -> stored id, from a deduplicated import) are recorded in
+        `template_aliases` and their ids removed from `templates`. An id stored as a template
+        loses any alias it had from an earlier import.
+        """
+        rows = [template_row(t, created_by) for t in templates]
+        existing = self._existing_hashes([row[0] for row in rows])
+        inserted = updated = unchanged = 0
+        pending: List[Tuple[str, str, str, str, Optional[str], str]] = []
+        for row in rows:
+            old_hash = existing.get(row[0])
+            if old_hash is None:
+                inserted += 1
+            elif changed_only and old_hash == row[5]:
+                unchanged += 1
+                continue
+            else:
+                updated += 1
+            pending.append(row)
+        alias_items = list(aliases.items()) if aliases else []
+        with self._conn:
+            self._conn.executemany(_SQLITE_UPSERT, pending)
+            self._conn.executemany("DELETE FROM template_aliases WHERE id = ?", [(row[0],) for row in rows])
+            self._conn.executemany(_SQLITE_ALIAS_UPSERT, alias_items)
+            self._conn.executemany("DELETE FROM templates WHERE id = ?", [(alias,) for alias, _tid in alias_items])
+        return StoreResult(inserted, updated, unchanged, len(alias_items))
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+
+def _copy_escape(v: Optional[str]) -> str:
+    # PostgreSQL COPY text format: \N is NULL; backslash, tab and newlines are escaped
+    if v is None:
+        return "\\N"
+    return v.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def write_postgres_copy(
+    fp: IO[str],
+    templates: Iterable[Dict[str, Any]],
+    changed_only: bool = False,
+    created_by: Optional[str] = None,
+    aliases: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Writes a psql script that bulk-loads the templates with COPY into a temporary table and
+    upserts them into `templates` on id in one transaction. Run it with `psql -f`.
+
+    With changed_only=True existing rows are only rewritten when their data differs. Aliases are
+    handled like SqliteTemplateStore.upsert: they are upserted into `template_aliases`, their ids
+    removed from `templates`, and imported ids lose any earlier alias. Returns the number of
+    template rows written.
+    """
+    fp.write("BEGIN;\n")
+    fp.write(
+        "CREATE TEMP TABLE templates_import (id text, name text, type text, data jsonb, created_by uuid)"
+        " ON COMMIT DROP;\n"
+    )
+    fp.write("COPY templates_import (id, name, type, data, created_by) FROM STDIN;\n")
+    n = 0
+    for t in templates:
+        row = template_row(t, created_by)
+        fp.write("\t".join(_copy_escape(v) for v in row[:5]))
+        fp.write("\n")
+        n += 1
+    fp.write("\\.\n")
+    fp.write(
+        "INSERT INTO templates (id, name, type, data, created_by)\n"
+        "SELECT id, name, type, data, created_by FROM templates_import\n"
+        "ON CONFLICT (id) DO UPDATE SET\n"
+        "    name = EXCLUDED.name,\n"
+        "    type = EXCLUDED.type,\n"
+        "    data = EXCLUDED.data,\n"
+        "    created_by = COALESCE(EXCLUDED.created_by, templates.created_by)"
+    )
+    if changed_only:
+        fp.write("\nWHERE templates.data IS DISTINCT FROM EXCLUDED.data")
+    fp.write(";\n")
+    fp.write(_PG_ALIAS_SCHEMA)
+    fp.write("DELETE FROM template_aliases WHERE id IN (SELECT id FROM templates_import);\n")
+    if aliases:
+        fp.write("CREATE TEMP TABLE template_aliases_import (id text, template_id text) ON COMMIT DROP;\n")
+        fp.write("COPY template_aliases_import (id, template_id) FROM STDIN;\n")
+        for alias, template_id in aliases.items():
+            fp.write(f"{_copy_escape(alias)}\t{_copy_escape(template_id)}\n")
+        fp.write("\\.\n")
+        fp.write(
+            "INSERT INTO template_aliases (id, template_id)\n"
+            "SELECT id, template_id FROM template_aliases_import\n"
+            "ON CONFLICT (id) DO UPDATE SET template_id = EXCLUDED.template_id;\n"
+        )
+        fp.write("DELETE FROM templates WHERE id IN (SELECT id FROM template_aliases_import);\n")
+    fp.write("COMMIT;\n")
+    return n
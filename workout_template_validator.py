@@ -0,0 +1,209 @@
+"""
+Admin-import validation for converted workout templates.
+
+Mirrors the rules of `importTemplatesFromJSON` in src/services/workoutService.ts, with the
+converter's stricter numeric checks (sets/reps/rounds must be ints). Unlike the importer it
+does not stop at the first problem: every error is collected with the template's sheet, row
+and field so a whole workbook can be fixed in one go.
+"""
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+
+WORKOUT_TYPES = ("strength", "emom", "circuit")
+
+
+@dataclass
+class ValidationIssue:
+    __slots__ = ("index", "field", "message", "sheet", "row", "name")
+
+    # 0-based position of the template in the output
+    index: int
+    # Dotted path of the offending field, e.g. "minuteA[2].label"
+    field: str
+    message: str
+    sheet: Optional[str]
+    # Row of the section's day header
+    row: Optional[int]
+    name: Optional[str]
+
+    def __str__(self) -> str:
+        where = f"Template {self.index + 1}"
+        if self.sheet is not None and self.row is not None:
+            where += f' (sheet "{self.sheet}", row {self.row})'
+        elif self.sheet is not None:
+            where += f' (sheet "{self.sheet}")'
+        return f"{where}: {self.message}"
+
+
+def _is_non_empty_string(v: Any) -> bool:
+    return isinstance(v, str) and v.strip() != ""
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+class TemplateValidator:
+    """
+    Validates templates one at a time as they are produced and accumulates every issue.
+
+    validate() returns True when the template is accepted, so streaming callers can reject a
+    template immediately while still getting a complete report from `issues` at the end.
+    """
+
+    __slots__ = ("issues", "checked", "_index", "_sheet", "_row", "_name")
+
+    def __init__(self) -> None:
+        self.issues: List[ValidationIssue] = []
+        self.checked = 0
+        self._index = 0
+        self._sheet: Optional[str] = None
+        self._row: Optional[int] = None
+        self._name: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def _add(self, field: str, message: str) -> None:
+        self.issues.append(ValidationIssue(self._index, field, message, self._sheet, self._row, self._name))
+
+    def validate(
+        self, t: Any, index: Optional[int] = None, sheet: Optional[str] = None, row: Optional[int] = None
+    ) -> bool:
+        """
+        Checks one template; `index` defaults to the number of templates validated so far.
+        """
+        before = len(self.issues)
+        self._index = self.checked if index is None else index
+        self._sheet = sheet
+        self._row = row
+        self._name = t.get("name") if isinstance(t, dict) and isinstance(t.get("name"), str) else None
+        self.checked += 1
+
+        if not isinstance(t, dict):
+            self._add("", "must be an object")
+            return False
+        if not _is_non_empty_string(t.get("name")):
+            self._add("name", 'Missing or invalid "name" field')
+
+        raw_type = t.get("type", "strength")
+        if not isinstance(raw_type, str):
+            self._add("type", '"type" must be a string')
+        elif raw_type not in WORKOUT_TYPES:
+            self._add("type", 'Invalid "type" (must be "strength", "emom", or "circuit")')
+        elif raw_type == "strength":
+            self._check_strength(t)
+        elif raw_type == "emom":
+            self._check_emom(t)
+        else:
+            self._check_circuit(t)
+        return len(self.issues) == before
+
+    def validate_all(self, templates: Iterable[Any]) -> bool:
+        ok = True
+        for t in templates:
+            ok = self.validate(t) and ok
+        return ok
+
+    def report(self, limit: int = 20) -> str:
+        lines = [str(issue) for issue in self.issues[:limit]]
+        if len(self.issues) > limit:
+            lines.append(f"... and {len(self.issues) - limit} more")
+        return "\n".join(lines)
+
+    def _check_strength(self, t: dict) -> None:
+        exs = t.get("exercises")
+        if not isinstance(exs, list) or len(exs) == 0:
+            self._add("exercises", 'Missing or empty "exercises" array')
+            return
+        for j, ex in enumerate(exs):
+            field = f"exercises[{j}]"
+            prefix = f"Exercise {j + 1}"
+            if not isinstance(ex, dict):
+                self._add(field, f"{prefix}: must be an object")
+                continue
+            if not _is_non_empty_string(ex.get("name")):
+                self._add(f"{field}.name", f'{prefix}: Missing or invalid "name" field')
+            if not _is_int(ex.get("sets")) or ex["sets"] < 1:
+                self._add(f"{field}.sets", f'{prefix}: "sets" must be an int >= 1')
+            if not _is_int(ex.get("reps")) or ex["reps"] < 1:
+                self._add(f"{field}.reps", f'{prefix}: "reps" must be an int >= 1')
+            if "weight" in ex and ex["weight"] is not None and (not _is_number(ex["weight"]) or ex["weight"] < 0):
+                self._add(f"{field}.weight", f'{prefix}: "weight" must be a number >= 0')
+
+    def _check_targeted(self, t: dict, key: str, required: bool, require_non_empty: bool) -> None:
+        items = t.get(key)
+        if items is None:
+            if required:
+                self._add(key, f'Missing "{key}" field')
+            return
+        if not isinstance(items, list):
+            self._add(key, f'"{key}" must be an array')
+            return
+        if require_non_empty and len(items) == 0:
+            self._add(key, f'"{key}" must not be empty')
+            return
+        for k, it in enumerate(items):
+            field = f"{key}[{k}]"
+            if not isinstance(it, dict):
+                self._add(field, f'"{key}" item {k + 1}: must be an object')
+                continue
+            if not _is_non_empty_string(it.get("label")):
+                self._add(f"{field}.label", f'"{key}" item {k + 1}: Missing or invalid "label"')
+            if not _is_non_empty_string(it.get("target")):
+                self._add(f"{field}.target", f'"{key}" item {k + 1}: Missing or invalid "target"')
+
+    def _check_exercises_array(self, t: dict) -> None:
+        if not isinstance(t.get("exercises"), list):
+            self._add("exercises", '"exercises" must be an array (can be empty)')
+
+    def _check_emom(self, t: dict) -> None:
+        duration = t.get("durationMinutes")
+        if not _is_number(duration) or duration <= 0:
+            self._add("durationMinutes", '"durationMinutes" must be a number > 0')
+        self._check_targeted(t, "warmup", required=False, require_non_empty=False)
+        self._check_targeted(t, "minuteA", required=True, require_non_empty=True)
+        self._check_targeted(t, "minuteB", required=True, require_non_empty=True)
+        self._check_targeted(t, "extras", required=False, require_non_empty=False)
+        self._check_exercises_array(t)
+
+    def _check_circuit(self, t: dict) -> None:
+        rounds = t.get("rounds")
+        if not _is_int(rounds) or rounds < 1:
+            self._add("rounds", '"rounds" must be an int >= 1')
+        rest = t.get("restBetweenRoundsSeconds")
+        if rest is not None and (not _is_int(rest) or rest < 0):
+            self._add("restBetweenRoundsSeconds", '"restBetweenRoundsSeconds" must be an int >= 0')
+        self._check_targeted(t, "warmup", required=False, require_non_empty=False)
+        sts = t.get("stations")
+        if not isinstance(sts, list) or len(sts) == 0:
+            self._add("stations", 'Missing or empty "stations" array')
+        else:
+            for j, st in enumerate(sts):
+                field = f"stations[{j}]"
+                prefix = f"Station {j + 1}"
+                if not isinstance(st, dict):
+                    self._add(field, f"{prefix}: must be an object")
+                    continue
+                if not _is_int(st.get("order")) or st["order"] < 1:
+                    self._add(f"{field}.order", f'{prefix}: "order" must be an int >= 1')
+                if not _is_non_empty_string(st.get("label")):
+                    self._add(f"{field}.label", f'{prefix}: Missing or invalid "label"')
+                if not _is_non_empty_string(st.get("target")):
+                    self._add(f"{field}.target", f'{prefix}: Missing or invalid "target"')
+        self._check_exercises_array(t)
+
+
+def validate_templates(templates: Iterable[Any]) -> List[ValidationIssue]:
+    """
+    Validates a whole list and returns every issue found (empty when the import would succeed).
+    """
+    validator = TemplateValidator()
+    validator.validate_all(templates)
+    return validator.issues